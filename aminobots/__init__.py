@@ -25,8 +25,14 @@ from typing import Any, NamedTuple, Literal, Coroutine
 
 from .acm import *
 from .amino import *
+from .cache import *
 from .bot import *
+from .eventqueue import *
+from .executor import *
 from .http import *
+from .paginator import *
+from .ratelimit import *
+from .retry import *
 from .rtc import *
 from .ws import *
 from . import (
@@ -239,6 +239,29 @@ class ABCAmino(metaclass=ABCMeta):
 
         """
 
+    @abstractmethod
+    async def get_users_info(self, ids: Any, comId: Any = ..., *, concurrency: Any = ...) -> Any:
+        """Request many user profiles at once.
+
+        Duplicated ids are requested once. A failed profile doesn't fail the others,
+        its error is returned instead.
+
+        Parameters
+        ----------
+        ids : Iterable[:class:`str`]
+            User IDs.
+        comId : :class:`int`, default=`0`
+            Community ID. If not provided, global profiles are returned
+        concurrency : :class:`int`, default=`8`
+            Maximum simultaneous requests.
+
+        Returns
+        -------
+        UsersInfo
+            path : `~aminobots.models.UsersInfo`
+
+        """
+
     @abstractmethod
     async def get_account_info(self) -> Any:
         """Request user account.
@@ -294,6 +317,35 @@ class ABCAmino(metaclass=ABCMeta):
 
         """
 
+    @abstractmethod
+    def iter_chat_members(self, id: Any, comId: Any = ..., *, limit: Any = ..., size: Any = ..., prefetch: Any = ..., concurrency: Any = ..., total: Any = ...) -> Any:
+        """Iterate over the members of a chat, page by page.
+
+        Parameters
+        ----------
+        id : :class:`str`
+            The chat ID.
+        comId : :class:`int`, default=`0`
+            The community ID of the chat.
+        limit : :class:`int` | `None`, default=`None`
+            Maximum number of members. `None` means all.
+        size : :class:`int`, default=`25`
+            Page size hint. Max size is `100`.
+        prefetch : :class:`bool`, default=`True`
+            Request the next page while the current one is consumed.
+        concurrency : :class:`int`, default=`1`
+            Pages requested at once after the first one. Items are still returned in order.
+        total : :class:`int` | `None`, default=`None`
+            Number of members (`membersCount` of :meth:`get_chat_info`), if known.
+            Avoids requests past the end when `concurrency` > `1`.
+
+        Returns
+        -------
+        Paginator
+            path : `~aminobots.Paginator` of `~aminobots.objects.Member`
+
+        """
+
     @abstractmethod
     async def get_community_info(self, id: Any) -> Any:
         """Request community profile.
@@ -358,6 +410,34 @@ class ABCAmino(metaclass=ABCMeta):
 
         """
 
+    @abstractmethod
+    def iter_wallet_history(self, *, limit: Any = ..., size: Any = ..., prefetch: Any = ..., concurrency: Any = ..., total: Any = ...) -> Any:
+        """Iterate over the account coin history, page by page.
+
+        Notes
+        -----
+        Requires login
+
+        Parameters
+        ----------
+        limit : :class:`int` | `None`, default=`None`
+            Maximum number of history entries. `None` means all.
+        size : :class:`int`, default=`25`
+            Page size hint. Max size is `100`.
+        prefetch : :class:`bool`, default=`True`
+            Request the next page while the current one is consumed.
+        concurrency : :class:`int`, default=`1`
+            Pages requested at once after the first one. Items are still returned in order.
+        total : :class:`int` | `None`, default=`None`
+            Number of history entries, if known. Avoids requests past the end when `concurrency` > `1`.
+
+        Returns
+        -------
+        Paginator
+            path : `~aminobots.Paginator` of `~aminobots.objects.CoinHistory`
+
+        """
+
     @abstractmethod
     async def get_account_push_settings(self) -> Any:
         """Request account push settings.
@@ -476,6 +556,36 @@ class ABCAmino(metaclass=ABCMeta):
 
         """
 
+    @abstractmethod
+    def iter_joined_chats(self, comId: Any = ..., *, limit: Any = ..., size: Any = ..., prefetch: Any = ..., concurrency: Any = ..., total: Any = ...) -> Any:
+        """Iterate over the global/community joined chats, page by page.
+
+        Notes
+        -----
+        Requires login
+
+        Parameters
+        ----------
+        comId : :class:`int`, default=`0`
+            The Community ID. If not provided, global joined-chats are iterated.
+        limit : :class:`int` | `None`, default=`None`
+            Maximum number of chats. `None` means all.
+        size : :class:`int`, default=`25`
+            Page size hint. Max size is `100`.
+        prefetch : :class:`bool`, default=`True`
+            Request the next page while the current one is consumed.
+        concurrency : :class:`int`, default=`1`
+            Pages requested at once after the first one. Items are still returned in order.
+        total : :class:`int` | `None`, default=`None`
+            Number of chats, if known. Avoids requests past the end when `concurrency` > `1`.
+
+        Returns
+        -------
+        Paginator
+            path : `~aminobots.Paginator` of `~aminobots.objects.Thread`
+
+        """
+
     @abstractmethod
     async def joined_communities(self, start: Any = ..., size: Any = ...) -> Any:
         """Request joined communities.
@@ -498,6 +608,34 @@ class ABCAmino(metaclass=ABCMeta):
 
         """
 
+    @abstractmethod
+    def iter_joined_communities(self, *, limit: Any = ..., size: Any = ..., prefetch: Any = ..., concurrency: Any = ..., total: Any = ...) -> Any:
+        """Iterate over the joined communities, page by page.
+
+        Notes
+        -----
+        Requires login
+
+        Parameters
+        ----------
+        limit : :class:`int` | `None`, default=`None`
+            Maximum number of communities. `None` means all.
+        size : :class:`int`, default=`25`
+            Page size hint. Max size is `100`.
+        prefetch : :class:`bool`, default=`True`
+            Request the next page while the current one is consumed.
+        concurrency : :class:`int`, default=`1`
+            Pages requested at once after the first one. Items are still returned in order.
+        total : :class:`int` | `None`, default=`None`
+            Number of communities, if known. Avoids requests past the end when `concurrency` > `1`.
+
+        Returns
+        -------
+        Paginator
+            path : `~aminobots.Paginator` of `~aminobots.objects.Community`
+
+        """
+
     @abstractmethod
     async def get_vip_users(self, comId: Any) -> Any:
         """Request community influencer profiles (vip user profiles)
@@ -570,6 +708,30 @@ class ABCAmino(metaclass=ABCMeta):
 
         """
 
+    @abstractmethod
+    def iter_search_chat(self, q: Any, comId: Any = ..., *, limit: Any = ..., size: Any = ..., prefetch: Any = ...) -> Any:
+        """Iterate over the results of a global/community chat search, following `nextPageToken`.
+
+        Parameters
+        ----------
+        q : :class:`str`
+            Chat title
+        comId : :class:`int`, default=`0`
+            The community ID. If not provided, global chat is searched.
+        limit : :class:`int` | `None`, default=`None`
+            Maximum number of chats. `None` means all.
+        size : :class:`int`, default=`25`
+            Page size hint. The search endpoint picks its own page size.
+        prefetch : :class:`bool`, default=`True`
+            Request the next page while the current one is consumed.
+
+        Returns
+        -------
+        Paginator
+            path : `~aminobots.Paginator` of `~aminobots.objects.Thread`
+
+        """
+
     @abstractmethod
     async def search_quiz(self, q: Any, comId: Any = ...) -> Any:
         """Search quiz posts.
@@ -699,6 +861,32 @@ class ABCRTCClient(metaclass=ABCMeta):
 
 class ABCHTTPClient(metaclass=ABCMeta):
 
+    @property
+    @abstractmethod
+    def closed(self) -> bool:
+        """Check if the HTTP session is closed or not created yet."""
+
+    @property
+    @abstractmethod
+    def session(self) -> Any:
+        """The keep-alive HTTP session of the client transport.
+
+        Returns
+        -------
+        aiohttp.ClientSession
+            Session shared by all the clients of the same transport.
+
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Close the HTTP session and release the pooled connections.
+
+        A shared :class:`Transport` is not closed, it must be closed by its owner.
+        The session is created again on the next request.
+
+        """
+
     @abstractmethod
     async def headers(
         self,
@@ -709,14 +897,14 @@ class ABCHTTPClient(metaclass=ABCMeta):
 
         Parameters
         ----------
-        data : :class:`str` | `None`
-            The http body string.
+        data : :class:`bytes` | `None`
+            The http body, as sent.
         content_type : :class:`str` | `None`
             Content-Type value of header.
 
         Examples
         --------
-        >>> data = ujson.dumps({})
+        >>> data = codec.dumpb({})
         >>> headers = await amino.prepare_headers(data)
 
         Returns
@@ -736,10 +924,13 @@ class ABCHTTPClient(metaclass=ABCMeta):
         *,
         comId: Any = ...,
         scope: Any = ...,
-        minify: Any = ...
+        minify: Any = ...,
+        idempotent: Any = ...
     ) -> Any:
         """Make a request to the amino api.
 
+        Failed requests are retried according to :attr:`HTTPClient.retry`.
+
         Parameters
         ----------
         method : :class:`str`
@@ -755,7 +946,9 @@ class ABCHTTPClient(metaclass=ABCMeta):
         scope : :class:`int`
             Scope community ID.
         minify : :class:`bool`
-            Json minify the data.
+            Has no effect, the body is always compact JSON.
+        idempotent : :class:`bool` | `None`
+            The request can be repeated safely. If `None`, it depends on the method (POST is not).
 
         Raises
         ------
@@ -767,6 +960,8 @@ class ABCHTTPClient(metaclass=ABCMeta):
             Raised when the request status <= `400`.
         RedirectionError
             Raised when the request status <= `300`.
+        ConnectionError
+            Raised when the connection failed in all the tries.
 
         Examples
         --------
@@ -785,10 +980,16 @@ class ABCHTTPClient(metaclass=ABCMeta):
         path: Any,
         params: Any = ...,
         comId: Any = ...,
-        scope: Any = ...
+        scope: Any = ...,
+        *,
+        coalesce: Any = ...
     ) -> Any:
         """Make a GET request to the amino api.
 
+        With `coalesce`, concurrent identical requests (same path, parameters and
+        session) share one network round-trip and receive the same response dict,
+        which must not be modified by the caller.
+
         Parameters
         ----------
         url : :class:`str`
@@ -799,6 +1000,9 @@ class ABCHTTPClient(metaclass=ABCMeta):
             Community ID/Global.
         scope : :class:`int`
             Scope Community ID.
+        coalesce : :class:`bool`
+            Share the response with identical in-flight requests. Default is `False`,
+            enabled by the methods that parse the response into a model.
 
         Raises
         ------
@@ -847,7 +1051,7 @@ class ABCHTTPClient(metaclass=ABCMeta):
         content_type : :class:`str` | `None`
             The content type for HTTP headers.
         minify : :class:`bool`
-            Json minify the data.
+            Has no effect, the body is always compact JSON.
 
         Raises
         ------
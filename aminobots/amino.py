@@ -20,8 +20,10 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar, Union
+from asyncio import Semaphore, gather
 from datetime import datetime
+from functools import partial
 import logging
 from pydantic import HttpUrl
 from .abc import ABCAmino
@@ -34,7 +36,12 @@ from .enums import (
     ValidationLevel,
     ValidationType
 )
-from .http import HTTPClient
+from .cache import ResponseCache
+from .errors import AminoException, check_api_error
+from .http import HTTPClient, Transport
+from .paginator import Paginator
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
 from .rtc import RTCClient
 from .ws import WSClient
 from .utils import (
@@ -46,8 +53,12 @@ from .utils import (
 )
 from .objects import (
     Account,
+    CoinHistory,
+    Community,
     Link,
     Media,
+    Member,
+    Thread,
     UserProfile
 )
 from .models import (
@@ -71,15 +82,19 @@ from .models import (
     SearchQuiz,
     SearchUser,
     UserInfo,
+    UsersInfo,
     VerifyPassword,
     WalletAds,
     WalletHistory,
     WalletInfo,
+    Model,
     parse_model
 )
 
 __all__ = ('Amino',)
 
+M = TypeVar('M', bound=Model)
+
 
 DEFAULT_LOGGER = logging.getLogger(__name__)
 DEFAULT_LOGGER.setLevel(logging.WARNING)
@@ -107,6 +122,23 @@ class Amino(ABCAmino):
         The UTC timezone offset for the client in hours. Default is `0`.
     raiseExceptions : :class:`bool` | `None`
         Whether to raise exceptions when errors occur. Default is `True`.
+    transport : :class:`Transport` | `None`
+        Connection pool shared with other clients. If not specified, the client uses its own pool.
+    retry : :class:`RetryPolicy` | `None`
+        Retry strategy for failed requests. Default is an exponential backoff with jitter.
+    ratelimiter : :class:`RateLimiter` | `None`
+        Client-side rate limiter, can be shared with other clients. If not specified, requests are not limited.
+    cache : :class:`ResponseCache` | `None`
+        Response cache for read-mostly endpoints. If not specified, responses are not cached.
+    trusted : :class:`bool`
+        Build the response models without validation, see :func:`~aminobots.models.construct_model`.
+        Faster for large responses, but urls and colors are plain strings. Default is `False`.
+    lazy : :class:`bool`
+        Like `trusted`, and the nested models of a response are built on first access.
+        Faster when only a few fields of a large response are read. Default is `False`.
+    **kwargs
+        Extra options for the :class:`HTTPClient`. (`user_agent`, `limit`,
+        `limit_per_host`, `keepalive_timeout`, `ttl_dns_cache`)
 
     Attributes
     ----------
@@ -114,16 +146,22 @@ class Amino(ABCAmino):
         The user's account information.
     auid : :class:`str`
         The user's id.
+    cache : :class:`ResponseCache` | `None`
+        The response cache.
     device : :class:`Device`
         The device being used by the client.
     http : :class:`HTTPClient`
         The HTTP client for Amino API requests.
+    lazy : :class:`bool`
+        Whether the nested response models are built on first access.
     raiseExceptions : :class:`bool`
         Whether to raise exceptions when errors occur.
     rtc : :class:`RTCClient`
         The RTC client for the Agora service.
     sid : Optional[:class:`str`]
         The session ID for the Amino client.
+    trusted : :class:`bool`
+        Whether the response models are built without validation.
     secret : Optional[:class:`str`]
         The encoded secret password for the user.
     user : :class:`UserProfile`
@@ -144,6 +182,11 @@ class Amino(ABCAmino):
     ... else:
     ...     print(response.api.message)
 
+    The client keeps its HTTP connections open between requests, close it when done:
+
+    >>> async with Amino() as amino:
+    ...     info = await amino.get_community_info(comId)
+
     """
 
     def __init__(
@@ -156,9 +199,18 @@ class Amino(ABCAmino):
         utc: int = 0,
         timeout: Optional[int] = None,
         raiseExceptions: bool = True,
+        transport: Optional[Transport] = None,
+        retry: Optional[RetryPolicy] = None,
+        ratelimiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        trusted: bool = False,
+        lazy: bool = False,
         **kwargs
     ) -> None:
-        self.http = HTTPClient(self, kwargs.pop('user_agent', None))
+        self.http = HTTPClient(self, transport=transport, retry=retry, ratelimiter=ratelimiter, **kwargs)
+        self.cache = cache
+        self.trusted = trusted
+        self.lazy = lazy
         self.rtc = RTCClient(self)
         self.ws = WSClient(self)
         self.account = Account.construct()
@@ -171,6 +223,46 @@ class Amino(ABCAmino):
         self.timeout = timeout
         self.raiseExceptions = raiseExceptions
 
+    async def __aenter__(self) -> 'Amino':
+        return self
+
+    async def __aexit__(self, *error) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the websocket, the cache refreshes and the HTTP session, and release the pooled connections."""
+        # closed first, otherwise it reconnects and opens the session again
+        await self.ws.close()
+        # the refreshes started by this client would open the session again
+        if self.cache is not None:
+            await self.cache.cancel_refreshes(self)
+        await self.http.close()
+
+    def _parse_model(self, cls: Type[M], data: Dict[str, Any]) -> M:
+        return parse_model(cls, data, trusted=self.trusted, lazy=self.lazy)
+
+    async def _cached_get(
+        self,
+        endpoint: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        comId: int = 0,
+        scope: int = 0
+    ) -> Dict[str, Any]:
+        """GET request through the response cache, if enabled for the endpoint."""
+        if self.cache is None or not self.cache.enabled(endpoint):
+            return await self.http.get(path, dict(params or {}), comId=comId, scope=scope, coalesce=True)
+        key = self.cache.key(endpoint, self.auid, comId, scope, path, sorted((params or {}).items()))
+        data, fresh = self.cache.lookup(key)
+        if data is None:
+            data = await self.http.get(path, dict(params or {}), comId=comId, scope=scope, coalesce=True)
+            self.cache.set(key, data)
+        elif not fresh:
+            # stale-while-revalidate
+            fetch = partial(self.http.get, path, dict(params or {}), comId=comId, scope=scope)
+            self.cache.revalidate(key, fetch, owner=self)
+        return data
+
     @property
     def timezone(self) -> int:
         """Timezone for amino http parameters."""
@@ -195,38 +287,83 @@ class Amino(ABCAmino):
 
     @typechecker
     async def get_from_link(self, link: Union[str, HttpUrl]) -> LinkResolution:
-        return parse_model(LinkResolution, await self.http.get('link-resolution', dict(q=link)))
+        return self._parse_model(LinkResolution, await self._cached_get('get_from_link', 'link-resolution', dict(q=link)))
 
     @typechecker
     async def get_from_device(self, device: Union[str, Device]) -> FromDevice:
-        return parse_model(FromDevice, await self.http.get('auid', dict(deviceId=device)))
+        return self._parse_model(FromDevice, await self.http.get('auid', dict(deviceId=device), coalesce=True))
 
     @typechecker
     async def get_link_info(self, link: str) -> LinkIdentify:
-        return parse_model(LinkIdentify, await self.http.get('community/link-identify', dict(q=link)))
+        return self._parse_model(LinkIdentify, await self._cached_get('get_link_info', 'community/link-identify', dict(q=link)))
 
     async def get_ads_info(self) -> WalletAds:
-        return parse_model(WalletAds, await self.http.get('wallet/setting/ads', dict(timezone=self.timezone)))
+        return self._parse_model(WalletAds, await self.http.get('wallet/setting/ads', dict(timezone=self.timezone), coalesce=True))
 
     @typechecker
     async def get_user_info(self, id: str, comId: int = 0) -> UserInfo:
-        return parse_model(UserInfo, await self.http.get(f'user-profile/{id}', comId=comId))
+        return self._parse_model(UserInfo, await self._cached_get('get_user_info', f'user-profile/{id}', comId=comId))
+
+    @typechecker
+    async def get_users_info(self, ids: Iterable[str], comId: int = 0, *, concurrency: int = 8) -> UsersInfo:
+        if isinstance(ids, str):
+            raise TypeError('ids must be an iterable of user IDs, not str')
+        if concurrency < 1:
+            raise ValueError('concurrency must be greater than 0.')
+        unique = list(dict.fromkeys(ids))
+        semaphore = Semaphore(concurrency)
+
+        async def fetch(id: str) -> Union[UserProfile, AminoException]:
+            async with semaphore:
+                try:
+                    data = await self._cached_get('get_user_info', f'user-profile/{id}', comId=comId)
+                except AminoException as exc:
+                    return exc
+            if data.get('api:statuscode', 0) != 0:
+                # raiseExceptions=False returns the error response
+                return check_api_error(data)
+            return self._parse_model(UserInfo, data).user
+
+        users: Dict[str, UserProfile] = {}
+        errors: Dict[str, AminoException] = {}
+        for id, result in zip(unique, await gather(*map(fetch, unique))):
+            if isinstance(result, AminoException):
+                errors[id] = result
+            else:
+                users[id] = result
+        return UsersInfo(users, errors)
 
     async def get_account_info(self) -> AccountInfo:
-        return parse_model(AccountInfo, await self.http.get('account'))
+        return self._parse_model(AccountInfo, await self.http.get('account', coalesce=True))
 
     @typechecker
     async def get_chat_info(self, id: str, comId: int = 0) -> ChatInfo:
-        return parse_model(ChatInfo, await self.http.get(f'chat/thread/{id}', comId=comId))
+        return self._parse_model(ChatInfo, await self._cached_get('get_chat_info', f'chat/thread/{id}', comId=comId))
 
     @typechecker
     async def get_chat_members(self, id: str, start: int = 0, size: int = 25, comId: int = 0) -> ChatMembers:
-        return parse_model(ChatMembers, await self.http.get(f'chat/thread/{id}/member',
-            dict(start=start, size=size, type='default', cv='1.2'), comId=comId))
+        return self._parse_model(ChatMembers, await self.http.get(f'chat/thread/{id}/member',
+            dict(start=start, size=size, type='default', cv='1.2'), comId=comId, coalesce=True))
+
+    @typechecker
+    def iter_chat_members(
+        self,
+        id: str,
+        comId: int = 0,
+        *,
+        limit: Optional[int] = None,
+        size: int = 25,
+        prefetch: bool = True,
+        concurrency: int = 1,
+        total: Optional[int] = None
+    ) -> Paginator[Member]:
+        return Paginator(lambda start, size: self.get_chat_members(id, start, size, comId),
+            lambda page: page.memberList, limit=limit, size=size, prefetch=prefetch,
+            concurrency=concurrency, total=total)
 
     @typechecker
     async def get_community_info(self, id: int) -> CommunityInfo:
-        return parse_model(CommunityInfo, await self.http.get('community/info',
+        return self._parse_model(CommunityInfo, await self._cached_get('get_community_info', 'community/info',
             dict(withInfluencerList=1, withTopicList='true', influencerListOrderStrategy='fansCount'), scope=id))
 
     @typechecker
@@ -234,19 +371,33 @@ class Amino(ABCAmino):
         return await self.http.get('community/trending', comId=id)
 
     async def get_wallet_info(self) -> WalletInfo:
-        return parse_model(WalletInfo, await self.http.get('wallet', dict(force=True)))
+        return self._parse_model(WalletInfo, await self.http.get('wallet', dict(force=True), coalesce=True))
 
     @typechecker
     async def get_wallet_history(self, start: int = 0, size: int = 25) -> WalletHistory:
-        return parse_model(WalletHistory, await self.http.get('wallet/coin/history', dict(start=start, size=size)))
+        return self._parse_model(WalletHistory, await self.http.get('wallet/coin/history', dict(start=start, size=size), coalesce=True))
+
+    @typechecker
+    def iter_wallet_history(
+        self,
+        *,
+        limit: Optional[int] = None,
+        size: int = 25,
+        prefetch: bool = True,
+        concurrency: int = 1,
+        total: Optional[int] = None
+    ) -> Paginator[CoinHistory]:
+        return Paginator(self.get_wallet_history, lambda page: page.historyList,
+            limit=limit, size=size, prefetch=prefetch,
+            concurrency=concurrency, total=total)
 
     @typechecker
     async def get_account_push_settings(self) -> AllPushSettings:
-        return parse_model(AllPushSettings, await self.http.get('account/push-settings'))
+        return self._parse_model(AllPushSettings, await self.http.get('account/push-settings', coalesce=True))
 
     @typechecker
     async def get_push_settings(self, comId: int = 0) -> PushNotification:
-        return parse_model(PushNotification, await self.http.get('user-profile/push', comId=comId))
+        return self._parse_model(PushNotification, await self.http.get('user-profile/push', comId=comId, coalesce=True))
 
     @typechecker
     async def set_push_settings(self, activities: Optional[bool], broadcasts: Optional[bool], comId: int = 0) -> PushNotification:
@@ -255,55 +406,100 @@ class Amino(ABCAmino):
             pushExtensions["communityActivitiesEnabled"] = activities
         if broadcasts is not None:
             pushExtensions["communityBroadcastsEnabled"] = broadcasts
-        return parse_model(PushNotification, await self.http.post('user-profile/push', dict(
+        return self._parse_model(PushNotification, await self.http.post('user-profile/push', dict(
             pushExtensions=pushExtensions, pushEnabled=bool(activities or broadcasts)), comId=comId))
 
     async def get_membership_info(self) -> MembershipInfo:
-        return parse_model(MembershipInfo, await self.http.get('membership'))
+        return self._parse_model(MembershipInfo, await self.http.get('membership', coalesce=True))
 
     @typechecker
     async def configure_membership(self, autoRenew: bool) -> MembershipConfig:
-        return parse_model(MembershipConfig, await self.http.post('membership/config', dict(
+        return self._parse_model(MembershipConfig, await self.http.post('membership/config', dict(
             paymentType=PaymentType.COIN, paymentContext=dict(isAutoRenew=autoRenew))))
 
     @typechecker
     async def joined_chats(self, start: int = 0, size: int = 25, comId: int = 0) -> JoinedChats:
-        return parse_model(JoinedChats, await self.http.get('chat/thread', dict(type='joined-me', start=start, size=size), comId=comId))
+        return self._parse_model(JoinedChats, await self.http.get('chat/thread', dict(type='joined-me', start=start, size=size), comId=comId, coalesce=True))
+
+    @typechecker
+    def iter_joined_chats(
+        self,
+        comId: int = 0,
+        *,
+        limit: Optional[int] = None,
+        size: int = 25,
+        prefetch: bool = True,
+        concurrency: int = 1,
+        total: Optional[int] = None
+    ) -> Paginator[Thread]:
+        return Paginator(lambda start, size: self.joined_chats(start, size, comId),
+            lambda page: page.chatList, limit=limit, size=size, prefetch=prefetch,
+            concurrency=concurrency, total=total)
 
     @typechecker
     async def joined_communities(self, start: int = 0, size: int = 25) -> JoinedCommunities:
-        return parse_model(JoinedCommunities, await self.http.get('community/joined', dict(v=1, start=start, size=size)))
+        return self._parse_model(JoinedCommunities, await self.http.get('community/joined', dict(v=1, start=start, size=size), coalesce=True))
+
+    @typechecker
+    def iter_joined_communities(
+        self,
+        *,
+        limit: Optional[int] = None,
+        size: int = 25,
+        prefetch: bool = True,
+        concurrency: int = 1,
+        total: Optional[int] = None
+    ) -> Paginator[Community]:
+        return Paginator(self.joined_communities, lambda page: page.communityList,
+            limit=limit, size=size, prefetch=prefetch,
+            concurrency=concurrency, total=total)
 
     @typechecker
     async def get_vip_users(self, comId: int) -> CommunityInfluencers:
-        return parse_model(CommunityInfluencers, await self.http.get('influencer', comId=comId))
+        return self._parse_model(CommunityInfluencers, await self._cached_get('get_vip_users', 'influencer', comId=comId))
 
     @typechecker
     async def search_user(self, q: str, comId: int = 0) -> SearchUser:
-        return parse_model(SearchUser, await self.http.get('user-profile', dict(q=q, timezone=self.timezone, type='name'), comId=comId))
+        return self._parse_model(SearchUser, await self.http.get('user-profile', dict(q=q, timezone=self.timezone, type='name'), comId=comId, coalesce=True))
 
     @typechecker
     async def search_community(self, q: str, language: Language = Language.ALL) -> SearchCommunity:
-        return parse_model(SearchCommunity, await self.http.get('community/search', dict(q=q, timezone=self.timezone, language=language.value)))
+        return self._parse_model(SearchCommunity, await self.http.get('community/search', dict(q=q, timezone=self.timezone, language=language.value), coalesce=True))
 
     @typechecker
     async def search_chat(self, q: str, pageToken: Optional[str] = None, comId: int = 0) -> SearchChat:
-        return parse_model(SearchChat, await self.http.get('chat/thread/explore/search',
-            dict(q=q, timezone=self.timezone, pageToken=pageToken), comId=comId))
+        params: Dict[str, Any] = dict(q=q, timezone=self.timezone)
+        if pageToken:
+            params['pageToken'] = pageToken
+        return self._parse_model(SearchChat, await self.http.get('chat/thread/explore/search', params, comId=comId, coalesce=True))
+
+    @typechecker
+    def iter_search_chat(
+        self,
+        q: str,
+        comId: int = 0,
+        *,
+        limit: Optional[int] = None,
+        size: int = 25,
+        prefetch: bool = True
+    ) -> Paginator[Thread]:
+        return Paginator(lambda pageToken, size: self.search_chat(q, pageToken, comId),
+            lambda page: page.chatWrapper.chatList, next_token=lambda page: page.paging.nextPageToken,
+            limit=limit, size=size, prefetch=prefetch)
 
     @typechecker
     async def search_quiz(self, q: str, comId: int) -> SearchQuiz:
-        return parse_model(SearchQuiz, await self.http.get('post/search', dict(q=q, timezone=self.timezone), comId=comId))
+        return self._parse_model(SearchQuiz, await self.http.get('post/search', dict(q=q, timezone=self.timezone), comId=comId, coalesce=True))
 
     @typechecker
     async def verify_password(self, password: Optional[str] = None, secret: Optional[str] = None) -> VerifyPassword:
-        return parse_model(VerifyPassword, await self.http.post('auth/verify-password', dict(secret=f'0 {password}' if password else secret)))
+        return self._parse_model(VerifyPassword, await self.http.post('auth/verify-password', dict(secret=f'0 {password}' if password else secret)))
 
     @typechecker
     async def login(self, email: str, password: Optional[str] = None, secret: Optional[str] = None) -> Login:
         if self.raiseExceptions and (not password and not secret):
             raise ValueError('Password or secret can\'t be empty.')
-        response = parse_model(Login, await self.http.post('auth/login', dict(
+        response = self._parse_model(Login, await self.http.post('auth/login', dict(
             clientType=ClientType.MASTER,
             action="normal",
             email=email,
@@ -326,7 +522,7 @@ class Amino(ABCAmino):
     ) -> Login:
         if self.raiseExceptions and (not password and not secret):
             raise ValueError('Password or secret can\'t be empty.')
-        response = parse_model(Login, await self.http.post('auth/login', dict(
+        response = self._parse_model(Login, await self.http.post('auth/login', dict(
             clientType=ClientType.MASTER,
             action="normal",
             phoneNumber=phone,
@@ -0,0 +1,366 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from abc import ABCMeta, abstractmethod
+from asyncio import Semaphore, Task, gather, get_running_loop
+from collections import Counter, OrderedDict
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Tuple,
+    Union
+)
+from os import PathLike
+from time import time
+import sqlite3
+from .codec import dumpb, loads
+
+__all__ = (
+    'CacheBackend',
+    'DiskBackend',
+    'MemoryBackend',
+    'ResponseCache'
+)
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class CacheBackend(metaclass=ABCMeta):
+    """Storage of the encoded responses of a :class:`ResponseCache`."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a value that has not expired, `None` otherwise."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, expires: float) -> None:
+        """Store a value until the `expires` timestamp."""
+
+    @abstractmethod
+    def delete(self, endpoint: Optional[str] = None, contains: Optional[str] = None) -> int:
+        """Delete the values of an endpoint whose key contains a string. Return the number of deleted values."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Delete all the values."""
+
+
+class MemoryBackend(CacheBackend):
+    """In-memory LRU backend bounded in bytes.
+
+    Parameters
+    ----------
+    max_bytes : :class:`int`, optional
+        Maximum size of the stored values. The least recently used values are discarded first.
+
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self._data: OrderedDict[str, Tuple[bytes, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] <= time():
+            self._pop(key)
+            return None
+        self._data.move_to_end(key)
+        return item[0]
+
+    def set(self, key: str, value: bytes, expires: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._data:
+            self._pop(key)
+        self._data[key] = (value, expires)
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            self._pop(next(iter(self._data)))
+
+    def _pop(self, key: str) -> None:
+        self.size -= len(self._data.pop(key)[0])
+
+    def delete(self, endpoint: Optional[str] = None, contains: Optional[str] = None) -> int:
+        prefix = '' if endpoint is None else endpoint + '|'
+        keys = [k for k in self._data if k.startswith(prefix) and (contains is None or contains in k)]
+        for key in keys:
+            self._pop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.size = 0
+
+
+class DiskBackend(CacheBackend):
+    """On-disk backend stored in a sqlite database, bounded in bytes.
+
+    Parameters
+    ----------
+    path : :class:`str` | :class:`os.PathLike`
+        The database file. Shared by all the processes using the same path.
+    max_bytes : :class:`int`, optional
+        Maximum size of the stored values. The least recently used values are discarded first.
+
+    """
+
+    def __init__(self, path: Union[str, PathLike], max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes: int = max_bytes
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'expires REAL NOT NULL, accessed REAL NOT NULL)'
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time()
+        row = self._db.execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._db.execute('DELETE FROM cache WHERE key = ?', (key,))
+            return None
+        self._db.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def set(self, key: str, value: bytes, expires: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._db.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', (key, value, expires, time()))
+        size = self._db.execute('SELECT COALESCE(SUM(LENGTH(value)), 0) FROM cache').fetchone()[0]
+        if size > self.max_bytes:
+            self._db.execute('DELETE FROM cache WHERE expires <= ?', (time(),))
+            for old, length in self._db.execute('SELECT key, LENGTH(value) FROM cache ORDER BY accessed').fetchall():
+                if size <= self.max_bytes:
+                    break
+                self._db.execute('DELETE FROM cache WHERE key = ?', (old,))
+                size -= length
+
+    def delete(self, endpoint: Optional[str] = None, contains: Optional[str] = None) -> int:
+        prefix = '' if endpoint is None else endpoint + '|'
+        cursor = self._db.execute(
+            "DELETE FROM cache WHERE substr(key, 1, ?) = ? AND instr(key, ?) > 0",
+            (len(prefix), prefix, contains or '')
+        )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        self._db.execute('DELETE FROM cache')
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class ResponseCache:
+    """Opt-in cache for the responses of read-mostly :class:`Amino` endpoints.
+
+    Only successful responses are stored. Each endpoint (the name of the
+    :class:`Amino` method) has its own time to live.
+
+    Endpoints with a `stale_ttl` use stale-while-revalidate: once the time to live
+    expires, the cached response is still returned immediately during `stale_ttl`
+    seconds while a background task refreshes it. Refreshes run with bounded
+    concurrency and only once per key.
+
+    Parameters
+    ----------
+    ttl : Mapping[:class:`str`, :class:`float`], optional
+        Seconds to live per endpoint. `0` disables the cache of an endpoint.
+    default_ttl : :class:`float`, optional
+        Seconds to live of the endpoints not in `ttl`.
+    stale_ttl : Mapping[:class:`str`, :class:`float`], optional
+        Seconds a response can be served stale after its time to live, per endpoint.
+    refresh_concurrency : :class:`int`, optional
+        Maximum number of simultaneous background refreshes.
+    backend : :class:`CacheBackend` | `None`, optional
+        The storage. Default is a :class:`MemoryBackend`.
+
+    Attributes
+    ----------
+    hits : :class:`collections.Counter`
+        Cache hits per endpoint, stale hits included.
+    misses : :class:`collections.Counter`
+        Cache misses per endpoint.
+    stale_hits : :class:`collections.Counter`
+        Stale responses served per endpoint.
+
+    Examples
+    --------
+    >>> cache = ResponseCache(ttl={'get_user_info': 30}, default_ttl=300)
+    >>> amino = Amino(cache=cache)
+    >>> cache.invalidate('get_user_info', contains=userId)
+
+    Serve profiles and communities up to 10 minutes old without waiting:
+
+    >>> cache = ResponseCache(stale_ttl={'get_community_info': 600, 'get_user_info': 600})
+
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[Mapping[str, float]] = None,
+        *,
+        default_ttl: float = 60.0,
+        stale_ttl: Optional[Mapping[str, float]] = None,
+        refresh_concurrency: int = 4,
+        backend: Optional[CacheBackend] = None
+    ) -> None:
+        self.ttl: Dict[str, float] = dict(ttl or {})
+        self.default_ttl: float = default_ttl
+        self.stale_ttl: Dict[str, float] = dict(stale_ttl or {})
+        self.refresh_concurrency: int = refresh_concurrency
+        self.backend: CacheBackend = MemoryBackend() if backend is None else backend
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self.stale_hits: Counter[str] = Counter()
+        self._refreshing: Dict[str, Task] = {}
+        self._owners: Dict[Task, Any] = {}
+        self._semaphore: Optional[Semaphore] = None
+
+    def __repr__(self) -> str:
+        return '%s(hits=%d, misses=%d)' % (type(self).__name__, self.hits.total(), self.misses.total())
+
+    def enabled(self, endpoint: str) -> bool:
+        return self.ttl.get(endpoint, self.default_ttl) > 0
+
+    @staticmethod
+    def key(endpoint: str, *parts: Any) -> str:
+        """Build the key of a request. The first part is always the endpoint."""
+        return '|'.join((endpoint, *map(str, parts)))
+
+    def lookup(self, key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Get a cached response and count the hit or miss.
+
+        Returns
+        -------
+        Tuple[dict | None, bool]
+            The response (if any) and whether it is still fresh.
+
+        """
+        endpoint = key.partition('|')[0]
+        value = self.backend.get(key)
+        if value is None:
+            self.misses[endpoint] += 1
+            return None, False
+        fresh_until, data = loads(value)
+        self.hits[endpoint] += 1
+        if fresh_until > time():
+            return data, True
+        self.stale_hits[endpoint] += 1
+        return data, False
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a fresh cached response and count the hit or miss."""
+        data, fresh = self.lookup(key)
+        return data if fresh else None
+
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        """Store a response with the time to live of its endpoint."""
+        endpoint = key.partition('|')[0]
+        ttl = self.ttl.get(endpoint, self.default_ttl)
+        if ttl > 0 and data.get('api:statuscode') == 0:
+            fresh_until = time() + ttl
+            expires = fresh_until + self.stale_ttl.get(endpoint, 0)
+            self.backend.set(key, dumpb([fresh_until, data]), expires)
+
+    def revalidate(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]], owner: Any = None) -> None:
+        """Refresh a stale response in a background task, unless it is already being refreshed.
+
+        The `owner` (e.g. the :class:`Amino` client of `fetch`) can cancel it with :meth:`cancel_refreshes`.
+        """
+        if key in self._refreshing:
+            return
+        task = get_running_loop().create_task(self._refresh(key, fetch))
+        self._refreshing[key] = task
+        self._owners[task] = owner
+        task.add_done_callback(partial(self._refresh_done, key))
+
+    def _refresh_done(self, key: str, task: Task) -> None:
+        # a cancelled refresh may have been replaced by a newer one
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+        del self._owners[task]
+
+    async def cancel_refreshes(self, owner: Any = None) -> None:
+        """Cancel and wait for the background refreshes of an owner. If `None`, all of them."""
+        tasks = [task for task, other in self._owners.items() if owner is None or other is owner]
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        if self._semaphore is None:
+            self._semaphore = Semaphore(self.refresh_concurrency)
+        async with self._semaphore:
+            try:
+                data = await fetch()
+            except Exception:
+                # keep serving the stale response, the next lookup tries again
+                return
+            self.set(key, data)
+
+    def invalidate(self, endpoint: Optional[str] = None, *, contains: Optional[str] = None) -> int:
+        """Delete cached responses and cancel their background refreshes.
+
+        Parameters
+        ----------
+        endpoint : :class:`str` | `None`
+            The :class:`Amino` method name. If `None`, all the endpoints.
+        contains : :class:`str` | `None`
+            Only the keys containing this string, e.g. a user ID or a link.
+
+        Returns
+        -------
+        int
+            Number of deleted responses.
+
+        """
+        prefix = '' if endpoint is None else endpoint + '|'
+        for key, task in list(self._refreshing.items()):
+            if key.startswith(prefix) and (contains is None or contains in key):
+                # the next lookup can start a new refresh right away
+                del self._refreshing[key]
+                task.cancel()
+        return self.backend.delete(endpoint, contains)
+
+    def clear(self) -> None:
+        """Delete all the cached responses and reset the counters."""
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+        self.backend.clear()
+        self.hits.clear()
+        self.misses.clear()
+        self.stale_hits.clear()
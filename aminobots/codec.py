@@ -0,0 +1,83 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from typing import Any, Union
+from enum import Enum
+
+__all__ = (
+    'BACKEND',
+    'JSONDecodeError',
+    'default',
+    'dumpb',
+    'dumps',
+    'loads'
+)
+
+
+def default(obj: Any) -> Any:
+    """Encode the objects unknown to the JSON encoder.
+
+    Called by :func:`dumps` and :func:`dumpb` during the encoding, so the enums
+    are converted to their value at any depth (dicts, lists) in a single pass.
+    """
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError('Object of type %s is not JSON serializable' % type(obj).__name__)
+
+
+# orjson when installed (pip install python-aminobots[speed]), ujson otherwise.
+# Both produce compact UTF-8 JSON without escaped slashes.
+try:
+    import orjson
+except ImportError:
+    import ujson
+
+    BACKEND: str = 'ujson'
+    JSONDecodeError = ujson.JSONDecodeError
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Deserialize a JSON document, :class:`str` or UTF-8 :class:`bytes`."""
+        return ujson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serialize `obj` to a compact JSON :class:`str`."""
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, default=default)
+
+    def dumpb(obj: Any) -> bytes:
+        """Serialize `obj` to compact JSON, encoded in UTF-8."""
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, default=default).encode('utf-8')
+else:
+    BACKEND = 'orjson'
+    JSONDecodeError = orjson.JSONDecodeError
+    OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Deserialize a JSON document, :class:`str` or UTF-8 :class:`bytes`."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serialize `obj` to a compact JSON :class:`str`."""
+        return orjson.dumps(obj, default=default, option=OPTIONS).decode('utf-8')
+
+    def dumpb(obj: Any) -> bytes:
+        """Serialize `obj` to compact JSON, encoded in UTF-8."""
+        return orjson.dumps(obj, default=default, option=OPTIONS)
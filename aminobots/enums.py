@@ -66,7 +66,8 @@ __all__ = (
     'UserType',
     'ValidationType',
     'ValidationLevel',
-    'VerifyType'
+    'VerifyType',
+    'WebSocketState'
 )
 
 if not TYPE_CHECKING:
@@ -85,6 +86,10 @@ if not TYPE_CHECKING:
             else:
                 return self.value != other
 
+        def __hash__(self) -> int:
+            """hash(this), consistent with the comparison by value"""
+            return hash(self.value)
+
         def __le__(self, other) -> bool:
             """this <= other"""
             if isinstance(other, Enum):
@@ -697,3 +702,10 @@ class VerifyType(Enum):
     UPDATE_IDENTITY = 6
     VERIFY_NEW_IDENTITY = 7
     DELETE_ACCOUNT = 8
+
+
+class WebSocketState(Enum):
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+    CLOSED = "closed"
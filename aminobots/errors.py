@@ -49,10 +49,11 @@ class WebSocketClosed(AminoException):
 
 class ServerError(AminoException):
     """Base Exception class for HTTP requests. Raised when the HTTP response status >= 500."""
-    def __init__(self, status: int, reason: str) -> None:
+    def __init__(self, status: int, reason: str, retry_after: Optional[float] = None) -> None:
         super().__init__(status, reason)
         self.status: int = status
         self.reason: str = reason
+        self.retry_after: Optional[float] = retry_after
 
     def __str__(self) -> str:
         return repr(f'{self.status} - {self.reason}')
@@ -94,22 +95,23 @@ class ServiceUnavailable(ServerError):
     """
 
 
-def check_server_error(status: int, reason: str) -> ServerError:
+def check_server_error(status: int, reason: str, retry_after: Optional[float] = None) -> ServerError:
     error = {
         500: InternalServerError,
-        501: NotImplementedError,
+        501: NotImplemented,
         502: BadGateway,
         503: ServiceUnavailable
     }.get(status, ServerError)
-    return error(status, reason)
+    return error(status, reason, retry_after)
 
 
 class ClientError(AminoException):
     """Base Exception class for HTTP requests. Raised when the HTTP response status >= 400."""
-    def __init__(self, status: int, reason: str) -> None:
+    def __init__(self, status: int, reason: str, retry_after: Optional[float] = None) -> None:
         super().__init__(status, reason)
         self.status: int = status
         self.reason: str = reason
+        self.retry_after: Optional[float] = retry_after
 
     def __str__(self) -> str:
         return repr(f'{self.status} - {self.reason}')
@@ -142,13 +144,13 @@ class TooManyClientRequests(ClientError):
     """
 
 
-def check_client_error(status: int, reason: str) -> ClientError:
+def check_client_error(status: int, reason: str, retry_after: Optional[float] = None) -> ClientError:
     error = {
         400: BadRequest,
         403: Forbidden,
         429: TooManyClientRequests
     }.get(status, ClientError)
-    return error(status, reason)
+    return error(status, reason, retry_after)
 
 
 class RedirectionError(AminoException):
@@ -0,0 +1,154 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from typing import (
+    Any,
+    Counter,
+    Dict,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+    Union
+)
+from asyncio import Queue
+import collections
+from .enums import ChatEvent, Enum, EventType
+
+__all__ = ('EventQueue',)
+
+EventKey = Union[EventType, ChatEvent, int, str]
+Policy = Literal['block', 'drop-new', 'drop-oldest']
+POLICIES = ('block', 'drop-new', 'drop-oldest')
+
+
+def event_key(event: EventKey) -> str:
+    """Dispatch key of an event: the frame type (`t`), or `t:type:mediaType` for
+    a chat event (see :class:`~aminobots.enums.ChatEvent`)."""
+    if isinstance(event, Enum):
+        event = event.value
+    return str(event)
+
+
+class EventQueue:
+    """Represents the bounded queue between the websocket reader and the handlers.
+
+    When the queue is full, the overflow policy of the event decides:
+
+    - `'block'`: the reader waits for free space, the server may drop a
+      socket that is not read.
+    - `'drop-new'`: the incoming event is discarded.
+    - `'drop-oldest'`: the oldest queued event is discarded.
+
+    Parameters
+    ----------
+    maxsize : :class:`int`, optional
+        Maximum number of queued events.
+    policy : :class:`str`, optional
+        Default overflow policy.
+    policies : Mapping[:class:`EventType` | :class:`ChatEvent` | :class:`int` | :class:`str`, :class:`str`] | `None`, optional
+        Overflow policy per frame type or chat event. A chat event takes
+        precedence over :attr:`EventType.CHAT`.
+
+    Attributes
+    ----------
+    stats : :class:`collections.Counter`
+        `queued`, `dropped` and `blocked` (puts that waited) events.
+    dropped : :class:`collections.Counter`
+        Dropped events per dispatch key.
+
+    Examples
+    --------
+    >>> amino.ws.queue = EventQueue(maxsize=500, policies={
+    ...     EventType.CHAT: 'drop-oldest',
+    ...     ChatEvent.DELETE_MESSAGE: 'block'
+    ... })
+
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        policy: Policy = 'block',
+        policies: Optional[Mapping[EventKey, Policy]] = None
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError('maxsize must be greater than 0.')
+        self.policy: Policy = policy
+        self.policies: Dict[str, Policy] = {event_key(k): v for k, v in (policies or {}).items()}
+        for value in (policy, *self.policies.values()):
+            if value not in POLICIES:
+                raise ValueError('invalid overflow policy %r, expected one of %s.' % (value, ', '.join(POLICIES)))
+        self.stats: Counter[str] = collections.Counter()
+        self.dropped: Counter[str] = collections.Counter()
+        self._queue: Queue[Tuple[str, Any]] = Queue(maxsize)
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def __repr__(self) -> str:
+        return '<EventQueue size=%d maxsize=%d policy=%r>' % (len(self), self.maxsize, self.policy)
+
+    @property
+    def maxsize(self) -> int:
+        return self._queue.maxsize
+
+    def policy_of(self, key: str) -> Policy:
+        """Overflow policy of a dispatch key."""
+        policy = self.policies.get(key)
+        if policy is None and ':' in key:
+            policy = self.policies.get(key.partition(':')[0])
+        return policy or self.policy
+
+    async def put(self, key: str, item: Any) -> bool:
+        """Queue an event, returns `False` if it was dropped."""
+        queue = self._queue
+        if queue.full():
+            policy = self.policy_of(key)
+            if policy == 'drop-new':
+                self._drop(key)
+                return False
+            if policy == 'drop-oldest':
+                old, _ = queue.get_nowait()
+                queue.task_done()
+                self._drop(old)
+            else:
+                self.stats['blocked'] += 1
+        await queue.put((key, item))
+        self.stats['queued'] += 1
+        return True
+
+    async def get(self) -> Tuple[str, Any]:
+        """Remove and return the next `(key, item)`, call :meth:`task_done` when processed."""
+        return await self._queue.get()
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued event is processed."""
+        await self._queue.join()
+
+    def _drop(self, key: str) -> None:
+        self.stats['dropped'] += 1
+        self.dropped[key] += 1
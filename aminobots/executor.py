@@ -0,0 +1,200 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Counter,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Set,
+    Tuple
+)
+from asyncio import (
+    Queue,
+    Semaphore,
+    Task,
+    TimeoutError,
+    create_task,
+    gather,
+    wait_for
+)
+import collections
+import logging
+
+__all__ = ('KeyedExecutor',)
+
+Job = Tuple[Callable[..., Awaitable[Any]], Tuple[Any, ...]]
+
+
+class KeyedExecutor:
+    """Represents an executor that runs the jobs of the same key in order and the
+    jobs of different keys concurrently.
+
+    The websocket client uses the `(ndcId, threadId)` of a frame as key, so the
+    events of a chat are handled in order while the other chats go on.
+
+    At most `max_keys` keys run at the same time. A key that still has jobs
+    after `quantum` of them goes back to the end of the line, so a busy chat
+    does not stall the quiet ones. The state of a key is dropped as soon as
+    its jobs are done, and the workers exit after `idle_timeout` seconds
+    without jobs.
+
+    Parameters
+    ----------
+    max_keys : :class:`int`, optional
+        Maximum number of keys processed concurrently.
+    max_pending : :class:`int`, optional
+        Maximum number of jobs waiting or running, :meth:`submit` waits above it.
+    quantum : :class:`int`, optional
+        Jobs of a key run in a row while other keys are waiting.
+    idle_timeout : :class:`float`, optional
+        Seconds a worker waits for a job before it exits.
+
+    Attributes
+    ----------
+    stats : :class:`collections.Counter`
+        `submitted`, `done` and `errors` jobs.
+
+    Examples
+    --------
+    >>> amino.ws.executor = KeyedExecutor(max_keys=200)
+
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 64,
+        max_pending: int = 1000,
+        quantum: int = 8,
+        idle_timeout: float = 30.0
+    ) -> None:
+        if max_keys < 1 or max_pending < 1 or quantum < 1:
+            raise ValueError('max_keys, max_pending and quantum must be greater than 0.')
+        self.max_keys: int = max_keys
+        self.quantum: int = quantum
+        self.idle_timeout: float = idle_timeout
+        self.logger: logging.Logger = logging.getLogger(__name__)
+        self.stats: Counter[str] = collections.Counter()
+        self._jobs: Dict[Hashable, Deque[Job]] = {}
+        self._ready: Queue[Hashable] = Queue()
+        self._scheduled: Set[Hashable] = set()
+        self._running: Set[Hashable] = set()
+        self._workers: List[Task] = []
+        self._idle: int = 0
+        self._pending = Semaphore(max_pending)
+
+    def __repr__(self) -> str:
+        return '<KeyedExecutor keys=%d active=%d workers=%d>' % (self.keys, self.active, self.workers)
+
+    @property
+    def keys(self) -> int:
+        """Number of keys with jobs."""
+        return len(self._jobs)
+
+    @property
+    def active(self) -> int:
+        """Number of keys running a job."""
+        return len(self._running)
+
+    @property
+    def workers(self) -> int:
+        """Number of worker tasks."""
+        return sum(not task.done() for task in self._workers)
+
+    async def submit(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """Queue `await func(*args)` after the other jobs of `key`."""
+        await self._pending.acquire()
+        self.stats['submitted'] += 1
+        jobs = self._jobs.get(key)
+        if jobs is None:
+            jobs = self._jobs[key] = collections.deque()
+        jobs.append((func, args))
+        if key not in self._scheduled:
+            self._scheduled.add(key)
+            self._ready.put_nowait(key)
+            # a new worker unless an idle one takes the key
+            self._workers = [task for task in self._workers if not task.done()]
+            if len(self._workers) < self.max_keys and self._ready.qsize() > self._idle:
+                self._workers.append(create_task(self._work()))
+
+    async def join(self) -> None:
+        """Wait until every submitted job is done."""
+        await self._ready.join()
+
+    async def close(self) -> None:
+        """Cancel the workers, the jobs not started are discarded."""
+        for task in self._workers:
+            task.cancel()
+        await gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        for jobs in self._jobs.values():
+            for _ in jobs:
+                self._pending.release()
+        self._jobs.clear()
+        self._scheduled.clear()
+        self._running.clear()
+        while not self._ready.empty():
+            self._ready.get_nowait()
+            self._ready.task_done()
+
+    async def _work(self) -> None:
+        ready = self._ready
+        while True:
+            self._idle += 1
+            try:
+                key = await wait_for(ready.get(), self.idle_timeout)
+            except TimeoutError:
+                return
+            finally:
+                self._idle -= 1
+            self._running.add(key)
+            try:
+                await self._run(key)
+            finally:
+                self._running.discard(key)
+                if self._jobs.get(key):
+                    # its turn is over, back to the end of the line
+                    ready.put_nowait(key)
+                else:
+                    self._jobs.pop(key, None)
+                    self._scheduled.discard(key)
+                ready.task_done()
+
+    async def _run(self, key: Hashable) -> None:
+        jobs = self._jobs[key]
+        count = 0
+        while jobs and (count < self.quantum or self._ready.empty()):
+            func, args = jobs.popleft()
+            count += 1
+            try:
+                await func(*args)
+            except Exception:
+                self.stats['errors'] += 1
+                self.logger.exception('job of %r failed.', key)
+            finally:
+                self.stats['done'] += 1
+                self._pending.release()
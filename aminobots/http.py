@@ -25,6 +25,7 @@ from typing import (
     Any,
     Dict,
     Final,
+    Hashable,
     NoReturn,
     Optional,
     TYPE_CHECKING,
@@ -32,24 +33,30 @@ from typing import (
     cast
 )
 from urllib.parse import urljoin
-from asyncio import sleep
-from time import time
+from asyncio import Future, ensure_future, gather, shield, sleep
+from functools import partial
+from time import monotonic, time
 from enum import Enum
-from aiohttp import ClientConnectionError, ClientSession
-from ujson import dumps, loads, JSONDecodeError
-from json_minify import json_minify
+from aiohttp import (
+    ClientConnectionError,
+    ClientSession,
+    DummyCookieJar,
+    TCPConnector
+)
 from yarl import URL
 from .abc import ABCHTTPClient
+from .codec import JSONDecodeError, dumpb, dumps, loads
+from .ratelimit import RateLimiter, path_template
+from .retry import RetryPolicy, parse_retry_after
 from .utils import (
     copy_all_docs,
     signature
 )
 from .errors import (
     APIError,
-    ClientError,
     ConnectionError,
-    RedirectionError,
-    ServerError,
+    TooManyClientRequests,
+    TooManyRequests,
     check_api_error,
     check_client_error,
     check_redirect_error,
@@ -58,18 +65,114 @@ from .errors import (
 if TYPE_CHECKING:
     from .amino import Amino
 
-__all__ = ('HTTPClient',)
+__all__ = ('HTTPClient', 'Transport')
 
 CONNECTION_TRIES = 5
-CONNECTION_SLEEP = 2
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 0
+KEEPALIVE_TIMEOUT = 30
+DNS_CACHE_TTL = 300
 USER_AGENT = 'Dalvik/2.1.0 (Linux; U; Android 7.1.2; SM-G965N Build/star2ltexx-user 7.1.; com.narvii.amino.master/3.4.33602)'
 USER_AGENT = 'Apple iPhone12,1 iOS v15.5 Main/3.12.2'
 
 
-def update_enum_data(json: dict) -> dict:
-    """Convert all enums values to python native value."""
-    return {k:v.value if isinstance(v, Enum) else update_enum_data(v)
-            if isinstance(v, dict) else v for k,v in json.items()}
+def query_value(value: Any) -> str:
+    """Convert a query parameter to :class:`str`, enums are sent as their value.
+
+    The enums of a JSON body are converted by the encoder, see :func:`aminobots.codec.default`.
+    """
+    return str(value.value if isinstance(value, Enum) else value)
+
+
+class Transport:
+    """Represents a pool of HTTP connections.
+
+    A transport can be shared by many :class:`Amino` clients, keeping a bounded
+    number of sockets regardless of the number of accounts. The request headers
+    are still built by each :class:`HTTPClient`.
+
+    The websockets use their own unbounded session, :attr:`ws_session`, so a
+    long-lived connection never takes one of the `limit` HTTP connections.
+
+    Parameters
+    ----------
+    limit : :class:`int`, optional
+        Total number of simultaneous connections. `0` means no limit.
+    limit_per_host : :class:`int`, optional
+        Simultaneous connections to the same endpoint. `0` means no limit.
+    keepalive_timeout : :class:`float`, optional
+        Seconds an idle connection is kept open for reuse.
+    ttl_dns_cache : :class:`int` | `None`, optional
+        Seconds a resolved host is cached. `None` caches forever.
+
+    Examples
+    --------
+    >>> async with Transport(limit=50) as transport:
+    ...     clients = [Amino(transport=transport) for _ in range(200)]
+
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = CONNECTION_LIMIT,
+        limit_per_host: int = CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        ttl_dns_cache: Optional[int] = DNS_CACHE_TTL
+    ) -> None:
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.keepalive_timeout: float = keepalive_timeout
+        self.ttl_dns_cache: Optional[int] = ttl_dns_cache
+        self._session: Optional[ClientSession] = None
+        self._ws_session: Optional[ClientSession] = None
+
+    async def __aenter__(self) -> Transport:
+        return self
+
+    async def __aexit__(self, *error) -> None:
+        await self.close()
+
+    @property
+    def closed(self) -> bool:
+        """Check if the session is closed or not created yet."""
+        return self._session is None or self._session.closed
+
+    @property
+    def session(self) -> ClientSession:
+        """The keep-alive session. Created on first access."""
+        if self.closed:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.ttl_dns_cache
+                ),
+                # authentication is sent in headers, cookies must not
+                # leak between the accounts sharing the pool.
+                cookie_jar=DummyCookieJar()
+            )
+        return cast(ClientSession, self._session)
+
+    @property
+    def ws_session(self) -> ClientSession:
+        """The session of the websockets, without connection limit. Created on first access."""
+        if self._ws_session is None or self._ws_session.closed:
+            self._ws_session = ClientSession(
+                connector=TCPConnector(limit=0, ttl_dns_cache=self.ttl_dns_cache),
+                cookie_jar=DummyCookieJar()
+            )
+        return self._ws_session
+
+    async def close(self) -> None:
+        """Close the sessions and release the pooled connections."""
+        if not self.closed:
+            await cast(ClientSession, self._session).close()
+        if self._ws_session is not None and not self._ws_session.closed:
+            await self._ws_session.close()
+        self._session = None
+        self._ws_session = None
 
 
 @copy_all_docs
@@ -82,11 +185,32 @@ class HTTPClient(ABCHTTPClient):
         Amino object.
     user_agent : :class:`str`, optional
         User-Agent header string.
+    transport : :class:`Transport` | `None`, optional
+        Shared connection pool. If not provided, a private one is created
+        with the following options.
+    retry : :class:`RetryPolicy` | `None`, optional
+        Retry strategy of the requests. Default is an exponential backoff with jitter.
+    ratelimiter : :class:`RateLimiter` | `None`, optional
+        Client-side rate limiter. If not provided, the requests are not limited.
+    limit : :class:`int`, optional
+        Total number of simultaneous connections. `0` means no limit.
+    limit_per_host : :class:`int`, optional
+        Simultaneous connections to the same endpoint. `0` means no limit.
+    keepalive_timeout : :class:`float`, optional
+        Seconds an idle connection is kept open for reuse.
+    ttl_dns_cache : :class:`int` | `None`, optional
+        Seconds a resolved host is cached. `None` caches forever.
 
     Attributes
     ----------
     amino : :class:`Amino`
         Amino client.
+    ratelimiter : :class:`RateLimiter` | `None`
+        Client-side rate limiter.
+    retry : :class:`RetryPolicy`
+        Retry strategy of the requests.
+    transport : :class:`Transport`
+        The connection pool used by the client.
     user_agent : :class:`str`
         Header user agent.
 
@@ -94,13 +218,47 @@ class HTTPClient(ABCHTTPClient):
 
     BASE: Final[URL] = URL('https://service.narvii.com/api/v1/')
 
-    def __init__(self, amino: Amino, /, user_agent: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        amino: Amino,
+        /,
+        user_agent: Optional[str] = None,
+        *,
+        transport: Optional[Transport] = None,
+        retry: Optional[RetryPolicy] = None,
+        ratelimiter: Optional[RateLimiter] = None,
+        **options: Any
+    ) -> None:
         self.amino: Amino = amino
         self.user_agent: str = user_agent or USER_AGENT
+        self.retry: RetryPolicy = retry or RetryPolicy(tries=CONNECTION_TRIES)
+        self.ratelimiter: Optional[RateLimiter] = ratelimiter
+        self._inflight: Dict[Hashable, Future] = {}
+        self._waiters: Dict[Future, int] = {}
+        self.transport: Transport = transport or Transport(**options)
+        self._owns_transport: bool = transport is None
+
+    @property
+    def closed(self) -> bool:
+        return self.transport.closed
+
+    @property
+    def session(self) -> ClientSession:
+        return self.transport.session
+
+    async def close(self) -> None:
+        # the shared requests would open the transport again
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+        # a shared transport is closed by its owner
+        if self._owns_transport:
+            await self.transport.close()
 
     async def headers(
         self,
-        data: Optional[str] = None,
+        data: Optional[bytes] = None,
         content_type: Optional[str] = None
     ) -> Dict[str, str]:
         headers = {
@@ -133,9 +291,10 @@ class HTTPClient(ABCHTTPClient):
         content_type: Optional[str] = None,
         comId: int = 0,
         scope: int = 0,
-        minify: bool = False
+        minify: bool = False,
+        idempotent: Optional[bool] = None
     ) -> Union[Dict[str, Any], NoReturn]:
-        body: Optional[str] = None
+        body: Optional[bytes] = None
         if scope:
             ndc = f'g/s-x{scope}/'
         elif not comId:
@@ -143,40 +302,51 @@ class HTTPClient(ABCHTTPClient):
         else:
             ndc = f'x{comId}/s/'
         path = path.removeprefix('/')
+        if self.ratelimiter is not None:
+            bucket = (str(self.amino.auid or self.amino.device), ndc, path_template(path))
         path = urljoin(ndc, path)
         url = urljoin(self.BASE.human_repr(), path)
         if isinstance(params, dict):
-            params.update(update_enum_data(params))
+            params = {k: query_value(v) for k, v in params.items()}
             if 'timezone' not in params:
-                params['timezone'] = self.amino.timezone
-            params.update({k: str(v) for k, v in params.items()})
+                params['timezone'] = str(self.amino.timezone)
         if isinstance(json, dict):
-            json.update(update_enum_data(json))
             if 'timestamp' not in json:
                 json['timestamp'] = int(time() * 1000)
             if path.startswith('auth') or path.startswith('account'):
                 if 'deviceID' not in json:
                     json['deviceID'] = self.amino.device
-            body = dumps(json)
-            if minify:
-                body = cast(str, json_minify(json))
+            # encoded once, the signature is computed over the bytes sent
+            body = dumpb(json)
         headers = await self.headers(body, content_type)
         content: Union[Dict[str, Any], str] = {}
-        for tries in range(CONNECTION_TRIES -1, -1, -1):
+        started = monotonic()
+        attempt = 0
+        while True:
+            error: Optional[BaseException] = None
+            if self.ratelimiter is not None:
+                await self.ratelimiter.acquire(bucket)
             try:
-                async with ClientSession() as session:
-                    async with session.request(
-                        method=method,
-                        url=url,
-                        params=params,
-                        data=body,
-                        headers=headers,
-                        proxy=self.amino.proxy
-                    ) as response:
-                        try:
-                            content = loads(await response.read())
-                        except JSONDecodeError:
-                            content = await response.text()
+                async with self.session.request(
+                    method=method,
+                    url=url,
+                    params=params,
+                    data=body,
+                    headers=headers,
+                    proxy=self.amino.proxy
+                ) as response:
+                    try:
+                        content = loads(await response.read())
+                    except JSONDecodeError:
+                        content = await response.text()
+            except ClientConnectionError as exc:
+                self.amino.logger.warning(dumps({
+                    'client': 'http',
+                    'message': 'No connection. %d tries.' % (attempt + 1)
+                }))
+                error = ConnectionError(exc)
+                error.__cause__ = exc
+            else:
                 # logger message
                 log: Dict[str, Any] = {
                     'client': 'http',
@@ -186,41 +356,79 @@ class HTTPClient(ABCHTTPClient):
                 if isinstance(content, dict) and content.get('api:statuscode') != 0:
                     # amino api exceptions
                     self.amino.logger.warning(dumps(log.setdefault('data', content)))
-                    if self.amino.raiseExceptions:
-                        raise check_api_error(content)
+                    error = check_api_error(content)
                 elif isinstance(content, str):
                     # amino web exceptions
                     msg = '%d - %s' % (response.status, response.reason)
                     self.amino.logger.warning(dumps(log.setdefault('data', msg)))
-                    if self.amino.raiseExceptions:
-                        if response.status >= 500:
-                            raise check_server_error(response.status, cast(str, response.reason))
-                        elif response.status >= 400:
-                            raise check_client_error(response.status, cast(str, response.reason))
-                        elif response.status >= 300:
-                            raise check_redirect_error(response.status, cast(str, response.reason))
-                        else:
-                            raise NotImplementedError(response.status, response.status)
-                else:
-                    break
-            except ClientConnectionError as exc:
-                self.amino.logger.warning(dumps({
-                    'client': 'http',
-                    'message': 'No connection. %d tries.' % tries
-                }))
-                await sleep(CONNECTION_SLEEP)
-                if tries < 1:
-                    raise ConnectionError(exc) from exc
-            except (ServerError, ClientError, RedirectionError) as error:
-                if tries > 1:
-                    await sleep(1)
-                    continue
-                else:
-                    raise error from None
+                    reason = cast(str, response.reason)
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if response.status >= 500:
+                        error = check_server_error(response.status, reason, retry_after)
+                    elif response.status >= 400:
+                        error = check_client_error(response.status, reason, retry_after)
+                    elif response.status >= 300:
+                        error = check_redirect_error(response.status, reason)
+                    else:
+                        error = NotImplementedError(response.status, response.status)
+            if self.ratelimiter is not None:
+                if isinstance(error, (TooManyRequests, TooManyClientRequests)):
+                    self.ratelimiter.throttle(bucket)
+                elif error is None:
+                    self.ratelimiter.recover(bucket)
+            if error is None:
+                break
+            delay = self.retry.delay(method, error, attempt, monotonic() - started, idempotent)
+            if delay is None:
+                # connection errors are always raised, there is no content to return
+                if self.amino.raiseExceptions or isinstance(error, ConnectionError):
+                    raise error
+                break
+            attempt += 1
+            await sleep(delay)
         return cast(dict, content)
 
-    async def get(self, path: str, params: dict = {}, comId: int = 0, scope: int = 0) -> Union[Dict[str, Any], NoReturn]:
-        return await self.request('GET', path=path, params=params, comId=comId, scope=scope)
+    async def get(
+        self,
+        path: str,
+        params: dict = {},
+        comId: int = 0,
+        scope: int = 0,
+        *,
+        coalesce: bool = False
+    ) -> Union[Dict[str, Any], NoReturn]:
+        if not coalesce:
+            return await self.request('GET', path=path, params=params, comId=comId, scope=scope)
+        key = (
+            path.removeprefix('/'),
+            comId,
+            scope,
+            frozenset((k, query_value(v)) for k, v in params.items()),
+            str(self.amino.sid)
+        )
+        task = self._inflight.get(key)
+        if task is None:
+            task = ensure_future(self.request('GET', path=path, params=params, comId=comId, scope=scope))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._inflight_done, key))
+        waiters = self._waiters
+        waiters[task] = waiters.get(task, 0) + 1
+        try:
+            # a cancelled caller must not cancel the request of the others
+            return await shield(task)
+        finally:
+            waiters[task] -= 1
+            if not waiters[task]:
+                del waiters[task]
+                # the last caller left, nobody needs the response
+                if not task.done():
+                    task.cancel()
+
+    def _inflight_done(self, key: Hashable, task: Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller was cancelled
 
     async def post(self, path: str, json: dict, comId: int = 0, scope: int = 0, content_type: Optional[str] = None, minify: bool = False) -> Union[Dict[str, Any], NoReturn]:
         return await self.request('POST', path=path, json=json, comId=comId, scope=scope, content_type=content_type, minify=minify)
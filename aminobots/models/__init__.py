@@ -15,6 +15,7 @@ from .chatinfo import ChatInfo
 from .chatmembers import ChatMembers
 from .communityinfluencers import CommunityInfluencers
 from .communityinfo import CommunityInfo
+from .decoding import construct_model
 from .fromdevice import FromDevice
 from .joinedchats import JoinedChats
 from .joinedcommunities import JoinedCommunities
@@ -30,6 +31,7 @@ from .searchcommunity import SearchCommunity
 from .searchquiz import SearchQuiz
 from .searchuser import SearchUser
 from .userinfo import UserInfo
+from .usersinfo import UsersInfo
 from .verifypassword import VerifyPassword
 from .walletads import WalletAds
 from .wallethistory import WalletHistory
@@ -57,18 +59,26 @@ __all__ = (
     'SearchQuiz',
     'SearchUser',
     'UserInfo',
+    'UsersInfo',
     'VerifyPassword',
     'WalletAds',
     'WalletHistory',
     'WalletInfo',
+    'construct_model',
     'parse_model'
 )
 
 M = TypeVar('M', bound=Model)
 
-def parse_model(cls: Type[M], data: Dict[str, Any]) -> M:
+def parse_model(cls: Type[M], data: Dict[str, Any], *, trusted: bool = False, lazy: bool = False) -> M:
+    """Build a response model. `trusted` skips the validation and `lazy` also
+    defers the nested models until first access, see :func:`construct_model`."""
     kwargs = {k: v for k, v in data.items() if not k.startswith('api:')}
     api_data = {k: v for k, v in data.items() if k.startswith('api:')}
+    if trusted or lazy:
+        if api_data:
+            kwargs.update(api=construct_model(_Api, api_data))
+        return construct_model(cls, kwargs, lazy=lazy)
     if api_data:
         kwargs.update(api=_Api(**api_data))
     return cls(**kwargs)
@@ -0,0 +1,314 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin
+)
+from dataclasses import MISSING, fields as dataclass_fields
+from datetime import datetime, timezone
+from enum import Enum
+from pydantic import BaseModel
+from pydantic.datetime_parse import parse_datetime
+from pydantic.fields import FieldInfo, ModelField
+from ..codec import loads
+
+__all__ = ('construct_model',)
+
+M = TypeVar('M', bound=BaseModel)
+Converter = Optional[Callable[[Any], Any]]
+
+object_setattr = object.__setattr__
+_DECODERS: Dict[Tuple[type, bool], Callable[[Any], Any]] = {}
+_LAZY_CLASSES: Dict[type, type] = {}
+
+
+def construct_model(cls: Type[M], data: Dict[str, Any], *, lazy: bool = False) -> M:
+    """Build a model from trusted data, without pydantic validation.
+
+    Nested models, lists and dicts of models, enums, datetimes and JSON strings
+    are converted, and the field validators of the models still run. Other
+    values are kept as received: urls and colors are plain strings and a
+    wrong type is not detected. A missing or `null` required value takes the
+    field default.
+
+    If `lazy` is set, the fields holding models (or lists and dicts of models)
+    keep their raw value and are built on first access, then cached. The
+    model is an instance of a subclass of `cls`; :meth:`~pydantic.BaseModel.dict`,
+    `repr`, comparison and pickling build the remaining fields first.
+
+    The decoder of each model class is generated on first use and cached.
+    """
+    return _decoder(cls, lazy)(data)
+
+
+def _decoder(cls: type, lazy: bool = False) -> Callable[[Any], Any]:
+    try:
+        return _DECODERS[cls, lazy]
+    except KeyError:
+        pass
+    fields: List[Tuple[str, str, Converter, Callable[[], Any], ModelField, tuple, bool]] = []
+    config = cls.__config__
+    target = _lazy_class(cls) if lazy else cls
+
+    def decode(data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        values: Dict[str, Any] = {}
+        fields_set = set()
+        pending: Dict[str, Any] = {}
+        for name, alias, convert, default, field, validators, deferred in fields:
+            value = data.get(alias, MISSING)
+            if value is MISSING:
+                if deferred:
+                    pending[name] = MISSING
+                else:
+                    values[name] = default()
+                continue
+            if value is None:
+                if not field.allow_none:
+                    values[name] = default()
+                    continue
+            elif deferred:
+                pending[name] = value
+                fields_set.add(name)
+                continue
+            elif convert is not None:
+                value = convert(value)
+            for validator in validators:
+                value = validator(cls, value, values, field, config)
+            values[name] = value
+            fields_set.add(name)
+        model = target.__new__(target)
+        object_setattr(model, '__dict__', values)
+        object_setattr(model, '__fields_set__', fields_set)
+        if lazy:
+            object_setattr(model, '__pending__', pending)
+        model._init_private_attributes()
+        return model
+
+    # registered before the fields are resolved, for self referencing models
+    _DECODERS[cls, lazy] = decode
+    for name, field in cls.__fields__.items():
+        convert = _converter(field.outer_type_, lazy)
+        if field.parse_json:
+            convert = _json(convert)
+        deferred = lazy and _nested(field.outer_type_)
+        fields.append((name, field.alias, convert, _default(field), field,
+                       tuple(field.post_validators or ()), deferred))
+        if deferred:
+            target.__deferred__[name] = fields[-1]
+    return decode
+
+
+def _lazy_class(cls: type) -> type:
+    try:
+        return _LAZY_CLASSES[cls]
+    except KeyError:
+        pass
+    lazy = _LAZY_CLASSES[cls] = type(cls)(cls.__name__, (cls,), {
+        '__module__': cls.__module__,
+        '__qualname__': cls.__qualname__,
+        '__slots__': ('__pending__',),
+        '__deferred__': {},
+        '__getattr__': _lazy_getattr,
+        '__reduce__': _lazy_reduce,
+        '__getstate__': _materialized(BaseModel.__getstate__),
+        '__repr_args__': _materialized(BaseModel.__repr_args__),
+        '_iter': _materialized(BaseModel._iter)
+    })
+    return lazy
+
+
+def _materialize(model: Any, name: str) -> Any:
+    pending: Dict[str, Any] = object.__getattribute__(model, '__pending__')
+    value = pending.pop(name)
+    _, _, convert, default, field, validators, _ = type(model).__deferred__[name]
+    if value is MISSING:
+        value = default()
+    else:
+        if convert is not None:
+            value = convert(value)
+        for validator in validators:
+            value = validator(type(model), value, model.__dict__, field, model.__config__)
+    # the next access finds it in __dict__ without calling __getattr__
+    model.__dict__[name] = value
+    return value
+
+
+def _lazy_getattr(self: Any, name: str) -> Any:
+    try:
+        pending = object.__getattribute__(self, '__pending__')
+    except AttributeError:
+        pending = None
+    if pending and name in pending:
+        return _materialize(self, name)
+    raise AttributeError('%r object has no attribute %r' % (type(self).__name__, name))
+
+
+def _lazy_reduce(self: Any) -> Any:
+    # pickled as the model class, once every field is built
+    return _unpickle, (type(self).__base__,), self.__getstate__()
+
+
+def _unpickle(cls: type) -> Any:
+    return cls.__new__(cls)
+
+
+def _materialized(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a method of BaseModel that reads every field from __dict__."""
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        pending = object.__getattribute__(self, '__pending__')
+        for name in list(pending):
+            if name in self.__dict__:
+                # assigned after the model was built
+                del pending[name]
+            else:
+                _materialize(self, name)
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+def _default(field: ModelField) -> Callable[[], Any]:
+    factory = field.default_factory
+    if isinstance(factory, type) and issubclass(factory, BaseModel):
+        # a validated default would cost as much as the values it replaces
+        return lambda: _decoder(factory)({})
+    if factory is not None:
+        return factory
+    if isinstance(field.default, (type(None), bool, int, float, str, bytes, Enum)):
+        value = field.default
+        return lambda: value
+    return field.get_default
+
+
+def _converter(annotation: Any, lazy: bool = False) -> Converter:
+    """Conversion of a raw value to `annotation`, `None` keeps the value."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _converter(args[0], lazy) if len(args) == 1 else None
+    if origin is Literal:
+        return None
+    if origin is list:
+        args = get_args(annotation)
+        item = _converter(args[0], lazy) if args else None
+        if item is None:
+            return None
+        return lambda value: [item(v) for v in value] if isinstance(value, list) else value
+    if origin is dict:
+        args = get_args(annotation)
+        item = _converter(args[1], lazy) if len(args) == 2 else None
+        if item is None:
+            return None
+        return lambda value: {k: item(v) for k, v in value.items()} if isinstance(value, dict) else value
+    if not isinstance(annotation, type):
+        return None
+    if issubclass(annotation, BaseModel):
+        # resolved on call, the model can be defined later or be recursive
+        return lambda value: _decoder(annotation, lazy)(value)
+    if hasattr(annotation, '__pydantic_model__'):
+        return _dataclass(annotation)
+    if issubclass(annotation, Enum):
+        return _enum(annotation)
+    if issubclass(annotation, datetime):
+        return _datetime
+    return None
+
+
+def _nested(annotation: Any) -> bool:
+    """Check if `annotation` holds models, directly or in a list or dict."""
+    origin = get_origin(annotation)
+    if origin in (Union, list, dict):
+        return any(_nested(arg) for arg in get_args(annotation))
+    return isinstance(annotation, type) and (
+        issubclass(annotation, BaseModel) or hasattr(annotation, '__pydantic_model__'))
+
+
+def _dataclass(cls: type) -> Callable[[Any], Any]:
+    """pydantic dataclasses are received as lists, e.g. Media."""
+    fields: List[Tuple[str, Converter, Any]] = []
+    for field in dataclass_fields(cls):
+        default = field.default
+        if isinstance(default, FieldInfo):
+            default = default.default
+        fields.append((field.name, _converter(field.type), None if default is MISSING else default))
+
+    def convert(value: Any) -> Any:
+        if isinstance(value, list):
+            value = dict(zip([name for name, _, _ in fields], value))
+        elif not isinstance(value, dict):
+            return value
+        obj = cls.__new__(cls)
+        for name, convert, default in fields:
+            item = value.get(name, default)
+            object_setattr(obj, name, item if convert is None or item is None else convert(item))
+        object_setattr(obj, '__pydantic_initialised__', True)
+        return obj
+    return convert
+
+
+def _enum(cls: Type[Enum]) -> Callable[[Any], Any]:
+    members = cls._value2member_map_
+
+    def convert(value: Any) -> Any:
+        try:
+            return members[value]
+        except (KeyError, TypeError):
+            pass
+        try:
+            return cls(value)
+        except ValueError:
+            return value
+    return convert
+
+
+def _datetime(value: Any) -> Any:
+    if isinstance(value, str) and value.endswith('Z'):
+        # the API format, e.g. 2023-01-01T00:00:00Z
+        try:
+            return datetime.fromisoformat(value[:-1]).replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    try:
+        return parse_datetime(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _json(convert: Converter) -> Callable[[Any], Any]:
+    def decode(value: Any) -> Any:
+        if isinstance(value, (str, bytes)):
+            value = loads(value)
+        return convert(value) if convert is not None else value
+    return decode
@@ -22,7 +22,7 @@ SOFTWARE.
 """
 from pydantic import Field
 from .model import Model
-from ..objects import CommunityInfoMapping, ThreadListWrapper
+from ..objects import CommunityInfoMapping, Paging, ThreadListWrapper
 
 __all__ = ('SearchChat',)
 
@@ -30,3 +30,4 @@ __all__ = ('SearchChat',)
 class SearchChat(Model):
     chatWrapper: ThreadListWrapper = Field(alias='threadListWrapper', default_factory=ThreadListWrapper)
     communityMap: CommunityInfoMapping = Field(alias='communityInfoMapping', default_factory=CommunityInfoMapping)
+    paging: Paging = Field(default_factory=Paging)
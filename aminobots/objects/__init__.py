@@ -38,3 +38,6 @@ from .userinfoincommunities import *
 from .userinfoinjoinedcommunities import *
 from .userprofile import *
 from .wallet import *
+
+# last, it imports the models decoder, which needs the objects above
+from .compact import *
@@ -0,0 +1,246 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import sys
+from typing import Any, Callable, ClassVar, Dict, Optional, Tuple, Type
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel
+from .author import Author, InfluencerInfo
+from .avatarframe import AvatarFrame
+from .chatmessage import ChatMessage, Sticker, StickerCollection
+from ..enums import MediaType, MessageType
+from ..models.decoding import _datetime, _enum
+
+__all__ = (
+    'CompactAuthor',
+    'CompactChatMessage',
+    'CompactObject',
+    'CompactSticker'
+)
+
+Converter = Optional[Callable[[Any], Any]]
+
+
+def _converter(annotation: Any) -> Converter:
+    # the conversions of the models decoder, nested objects are kept raw
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return _enum(annotation)
+    if annotation is datetime:
+        return _datetime
+    return None
+
+
+class CompactObject:
+    """Base class of the slotted variants of the websocket objects.
+
+    A compact object has the attributes of its pydantic model, stored in
+    `__slots__` and built from the raw dict without validation. Ids are
+    interned, enums and datetimes are converted, and the nested objects that
+    are rarely read are kept raw and built on access.
+
+    Use :meth:`to_model` to get the validated pydantic model.
+    """
+    __slots__ = ()
+    __model__: ClassVar[Type[BaseModel]]
+    # (setter, key, converter, default) of each slot built from the raw dict
+    __decoders__: ClassVar[Tuple[Tuple[Callable[[Any, Any], None], str, Converter, Any], ...]]
+    __converters__: ClassVar[Dict[str, Callable[[Any], Any]]] = {}
+
+    def __init_subclass__(cls, model: Type[BaseModel], **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.__model__ = model
+        decoders = []
+        for name in cls.__slots__:
+            field = model.__fields__.get(name.lstrip('_'))
+            if field is None:
+                continue
+            if name.startswith('_'):
+                # raw nested object, see the property of the same name
+                convert, default = None, None
+            elif name in cls.__converters__:
+                convert, default = cls.__converters__[name], None
+            else:
+                convert, default = _converter(field.outer_type_), field.default
+            decoders.append((getattr(cls, name).__set__, field.alias, convert, default))
+        cls.__decoders__ = tuple(decoders)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Build the object from a raw dict of the API, e.g. the `chatMessage`
+        of a websocket event."""
+        self = object.__new__(cls)
+        for setter, key, convert, default in cls.__decoders__:
+            value = data.get(key)
+            if value is None:
+                value = default
+            elif convert is not None:
+                value = convert(value)
+            setter(self, value)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the raw dict of the object, keyed by the API names."""
+        data = {}
+        for name in self.__slots__:
+            field = self.__model__.__fields__.get(name.lstrip('_'))
+            if field is None:
+                continue
+            value = getattr(self, name)
+            if isinstance(value, CompactObject):
+                value = value.to_dict()
+            if value is not None:
+                data[field.alias] = value
+        return data
+
+    def to_model(self) -> BaseModel:
+        """Build the full pydantic model, with validation."""
+        return self.__model__.parse_obj(self.to_dict())
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        attrs = ' '.join('%s=%r' % (name, getattr(self, name)) for name in self.__slots__ if not name.startswith('_'))
+        return '<%s %s>' % (type(self).__name__, attrs)
+
+
+class CompactAuthor(CompactObject, model=Author):
+    """Slotted variant of :class:`Author`."""
+    __slots__ = (
+        'accountMembershipStatus',
+        'comId',
+        'followersCount',
+        'followingStatus',
+        'frameId',
+        'icon',
+        'id',
+        'isGlobal',
+        'isNicknameVerified',
+        'level',
+        'membershipStatus',
+        'nickname',
+        'reputation',
+        'role',
+        'status',
+        '_frame',
+        '_vip'
+    )
+    __converters__ = {'id': sys.intern}
+
+    def to_model(self) -> Author:
+        return super().to_model()
+
+    @property
+    def frame(self) -> AvatarFrame:
+        return AvatarFrame.parse_obj(self._frame or {})
+
+    @property
+    def vip(self) -> InfluencerInfo:
+        return InfluencerInfo.parse_obj(self._vip or {})
+
+
+class CompactSticker(CompactObject, model=Sticker):
+    """Slotted variant of :class:`Sticker`."""
+    __slots__ = (
+        'collectionId',
+        'createdTime',
+        'icon',
+        'iconV2',
+        'id',
+        'mediumIcon',
+        'mediumIconV2',
+        'name',
+        'smallIcon',
+        'smallIconV2',
+        'status',
+        'usedCount',
+        '_collection'
+    )
+    __converters__ = {'collectionId': sys.intern, 'id': sys.intern}
+
+    def to_model(self) -> Sticker:
+        return super().to_model()
+
+    @property
+    def collection(self) -> StickerCollection:
+        return StickerCollection.parse_obj(self._collection or {})
+
+
+class CompactChatMessage(CompactObject, model=ChatMessage):
+    """Slotted variant of :class:`ChatMessage`, for the websocket events.
+
+    `author` is a :class:`CompactAuthor`, `None` if the event has no author,
+    and the fields of the `extensions` are attributes of the message.
+    """
+    __slots__ = (
+        'author',
+        'authorId',
+        'chatId',
+        'clientRefId',
+        'content',
+        'createdTime',
+        'id',
+        'includedInSummary',
+        'isHidden',
+        'media',
+        'mediaType',
+        'type',
+        'mediaDuration',
+        'originalStickerId',
+        'sticker'
+    )
+    __converters__ = {
+        'author': CompactAuthor.from_dict,
+        'authorId': sys.intern,
+        'chatId': sys.intern
+    }
+
+    author: Optional[CompactAuthor]
+    mediaType: MediaType
+    sticker: Optional[CompactSticker]
+    type: MessageType
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CompactChatMessage':
+        self = super().from_dict(data)
+        extensions = data.get('extensions') or {}
+        sticker = extensions.get('sticker')
+        self.mediaDuration = extensions.get('duration')
+        self.originalStickerId = extensions.get('originalStickerId')
+        self.sticker = CompactSticker.from_dict(sticker) if sticker else None
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        extensions = {
+            'duration': self.mediaDuration,
+            'originalStickerId': self.originalStickerId,
+            'sticker': self.sticker.to_dict() if self.sticker else None
+        }
+        data['extensions'] = {key: value for key, value in extensions.items() if value is not None}
+        return data
+
+    def to_model(self) -> ChatMessage:
+        return super().to_model()
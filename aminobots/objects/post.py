@@ -22,7 +22,6 @@ SOFTWARE.
 """
 from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
-from ujson import loads
 from pydantic import BaseModel, HttpUrl, Json, Field, validator
 from pydantic.color import Color
 from .media import Media
@@ -30,6 +29,7 @@ from .style import Style
 from .tipinfo import TipInfo
 from ..objects import Author
 from ..enums import ObjectType
+from ..codec import loads
 
 __all__ = ('Post',)
 
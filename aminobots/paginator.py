@@ -0,0 +1,218 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union
+)
+from asyncio import Future, ensure_future
+from collections import deque
+
+__all__ = ('Paginator',)
+
+T = TypeVar('T')
+Page = Any
+Cursor = Union[int, str, None]
+
+
+class Paginator(Generic[T]):
+    """Async iterator over the items of a paginated endpoint.
+
+    The next page is requested while the items of the current page are consumed,
+    so a consumer slower than the API doesn't wait for the network between pages.
+    Offset paginated endpoints can also fan out: after the first page, up to
+    `concurrency` pages are requested at once and their items are still returned
+    in order.
+
+    .. code-block:: python3
+
+        async for chat in amino.iter_joined_chats(comId, limit=200):
+            ...
+
+    Parameters
+    ----------
+    fetch : `Callable`
+        Coroutine function taking the cursor and the page size, returning a page.
+        The cursor is the start index, or the page token if `next_token` is provided.
+    items : `Callable`
+        Function returning the items of a page.
+    next_token : `Callable` | `None`, optional
+        Function returning the `nextPageToken` of a page. If not provided the
+        endpoint is paginated by offset, and a page shorter than requested is the last.
+    limit : :class:`int` | `None`, optional
+        Maximum number of items. `None` means all.
+    size : :class:`int`, optional
+        Page size hint. The last page is shortened to not exceed `limit`. Token
+        paginated endpoints may ignore it.
+    prefetch : :class:`bool`, optional
+        Request the next page before the current one is consumed.
+    concurrency : :class:`int`, optional
+        Maximum pages requested at once by an offset paginated endpoint. Without
+        `total`, up to `concurrency - 1` requests past the end are cancelled or wasted.
+    total : :class:`int` | `None`, optional
+        Number of items of the listing, if known. No page is requested past it.
+
+    Attributes
+    ----------
+    count : :class:`int`
+        Number of items returned.
+    pages : :class:`int`
+        Number of pages received.
+
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Cursor, int], Awaitable[Page]],
+        items: Callable[[Page], Iterable[T]],
+        *,
+        next_token: Optional[Callable[[Page], Optional[str]]] = None,
+        limit: Optional[int] = None,
+        size: int = 25,
+        prefetch: bool = True,
+        concurrency: int = 1,
+        total: Optional[int] = None
+    ) -> None:
+        if size < 1:
+            raise ValueError('size must be greater than 0.')
+        if concurrency < 1:
+            raise ValueError('concurrency must be greater than 0.')
+        if limit is not None and limit < 0:
+            raise ValueError('limit can\'t be negative.')
+        self.limit = limit
+        self.size = size
+        self.prefetch = prefetch
+        self.concurrency = concurrency
+        self.total = total
+        self.count = 0
+        self.pages = 0
+        self._fetch = fetch
+        self._items = items
+        self._next_token = next_token
+        self._cursor: Cursor = None if next_token is not None else 0
+        self._fetched = 0
+        self._done = False
+        self._buffer: Deque[T] = deque()
+        self._pending: Deque[Tuple[Future, Cursor, int]] = deque()
+
+    def __repr__(self) -> str:
+        return '<{} count={} pages={} done={}>'.format(
+            type(self).__name__, self.count, self.pages, self._done and not self._buffer)
+
+    async def __aenter__(self) -> 'Paginator[T]':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    def __aiter__(self) -> 'Paginator[T]':
+        return self
+
+    async def __anext__(self) -> T:
+        while not self._buffer:
+            if not self._pending and not self._request():
+                self._done = True
+                raise StopAsyncIteration
+            future, cursor, size = self._pending.popleft()
+            try:
+                page = await future
+            except BaseException:
+                # the next call starts again from the failed page
+                self._cancel()
+                self._cursor = cursor
+                raise
+            self._receive(page, size)
+            if self.prefetch or self.concurrency > 1:
+                while len(self._pending) < self._window() and self._request():
+                    pass
+        self.count += 1
+        return self._buffer.popleft()
+
+    def _window(self) -> int:
+        # the cursor of a token paginated page is only known after the previous one
+        if self._next_token is not None or not self.pages:
+            return 1
+        return self.concurrency
+
+    def _request(self) -> bool:
+        if self._done:
+            return False
+        cursor, size = self._cursor, self.size
+        if self._next_token is None:
+            offset = int(cursor or 0)
+            if self.total is not None:
+                size = min(size, self.total - offset)
+            if self.limit is not None:
+                size = min(size, self.limit - offset)
+            self._cursor = offset + size
+        elif self.limit is not None:
+            size = min(size, self.limit - self._fetched)
+        if size <= 0:
+            # every page was requested, the end is only seen once they are received
+            return False
+        self._pending.append((ensure_future(self._fetch(cursor, size)), cursor, size))
+        return True
+
+    def _receive(self, page: Page, size: int) -> None:
+        items = list(self._items(page))
+        if self.limit is not None:
+            del items[self.limit - self._fetched:]
+        self.pages += 1
+        self._fetched += len(items)
+        if self._next_token is not None:
+            token = self._next_token(page)
+            if not items or not token or token == self._cursor:
+                self._done = True
+            self._cursor = token
+        elif len(items) < size:
+            self._done = True
+            self._cancel()
+        self._buffer.extend(items)
+
+    def _cancel(self) -> None:
+        while self._pending:
+            future, _, _ = self._pending.pop()
+            if future.done():
+                if not future.cancelled():
+                    future.exception()
+            else:
+                future.cancel()
+
+    async def aclose(self) -> None:
+        """Stop the iteration and cancel the requested pages."""
+        self._done = True
+        self._buffer.clear()
+        self._cancel()
+
+    async def collect(self) -> List[T]:
+        """Return the remaining items in a list."""
+        return [item async for item in self]
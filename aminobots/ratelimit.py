@@ -0,0 +1,240 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from typing import (
+    Dict,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple
+)
+from asyncio import sleep
+from time import monotonic
+import re
+
+__all__ = (
+    'BucketState',
+    'RateLimiter',
+    'TokenBucket'
+)
+
+ID_PATTERN = re.compile(r'(?<=/)(?:[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}|\d+)(?=/|$)')
+
+BucketKey = Tuple[str, str, str]
+
+
+def path_template(path: str) -> str:
+    """Replace the object IDs of a resource path by `{id}`.
+
+    Examples
+    --------
+    ```
+    >>> path_template('chat/thread/5e7a3e1c-4b2f-4c3a-9a7d-1f2e3d4c5b6a/member')
+    'chat/thread/{id}/member'
+    ```
+    """
+    return ID_PATTERN.sub('{id}', '/' + path)[1:]
+
+
+class BucketState(NamedTuple):
+    """Snapshot of a token bucket."""
+    rate: float
+    base_rate: float
+    capacity: float
+    tokens: float
+    throttled: int
+
+
+class TokenBucket:
+    """Represents an adaptive token bucket.
+
+    Tokens are refilled at `rate` per second up to `capacity`. The rate is
+    halved (`decrease`) when the server rejects a request for rate limiting,
+    and recovers by `recovery` tokens/second on every accepted request.
+
+    Parameters
+    ----------
+    rate : :class:`float`
+        Tokens refilled per second.
+    capacity : :class:`float`
+        Maximum burst size.
+    min_rate : :class:`float`, optional
+        The rate never decreases below this value.
+    decrease : :class:`float`, optional
+        Multiplier applied to the rate when throttled.
+    recovery : :class:`float`, optional
+        Rate increase after each accepted request.
+
+    """
+
+    __slots__ = (
+        'base_rate',
+        'capacity',
+        'decrease',
+        'min_rate',
+        'rate',
+        'recovery',
+        'throttled',
+        'tokens',
+        'updated'
+    )
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        *,
+        min_rate: float = 0.1,
+        decrease: float = 0.5,
+        recovery: float = 0.05
+    ) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError('rate must be positive and capacity at least 1.')
+        self.base_rate: float = rate
+        self.rate: float = rate
+        self.capacity: float = capacity
+        self.min_rate: float = min(min_rate, rate)
+        self.decrease: float = decrease
+        self.recovery: float = recovery
+        self.tokens: float = capacity
+        self.throttled: int = 0
+        self.updated: float = monotonic()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it."""
+        self._refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a token is available."""
+        delay = self.reserve()
+        if delay:
+            await sleep(delay)
+
+    def throttle(self) -> None:
+        """Decrease the rate after a rate limit response."""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.tokens = min(self.tokens, 0.0)
+        self.throttled += 1
+
+    def recover(self) -> None:
+        """Increase the rate after an accepted request."""
+        if self.rate < self.base_rate:
+            self._refill()
+            self.rate = min(self.base_rate, self.rate + self.recovery)
+
+    @property
+    def idle(self) -> bool:
+        """The bucket is full and at its base rate. (can be discarded)"""
+        self._refill()
+        return self.tokens >= self.capacity and self.rate >= self.base_rate
+
+    def state(self) -> BucketState:
+        self._refill()
+        return BucketState(self.rate, self.base_rate, self.capacity, self.tokens, self.throttled)
+
+
+class RateLimiter:
+    """Client-side rate limiter for the HTTP client.
+
+    Requests are delayed before they are sent, with a token bucket per
+    `(account, ndc scope, path template)`. A limiter can be shared by many
+    :class:`Amino` clients, buckets are still separated per account.
+
+    Parameters
+    ----------
+    rate : :class:`float`, optional
+        Default requests per second of each bucket.
+    burst : :class:`int`, optional
+        Default burst size of each bucket.
+    limits : Mapping[:class:`str`, Tuple[:class:`float`, :class:`int`]], optional
+        `(rate, burst)` for specific path templates, e.g. `{'chat/thread/{id}/message': (1, 3)}`.
+    max_buckets : :class:`int`, optional
+        Idle buckets are discarded when this number is exceeded.
+    **options
+        Extra options for :class:`TokenBucket`. (`min_rate`, `decrease`, `recovery`)
+
+    Examples
+    --------
+    >>> limiter = RateLimiter(rate=3, burst=5)
+    >>> amino = Amino(ratelimiter=limiter)
+    >>> limiter.states()
+    {('auid', 'g/s/', 'user-profile/{id}'): BucketState(rate=3, ...)}
+
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 10,
+        *,
+        limits: Optional[Mapping[str, Tuple[float, int]]] = None,
+        max_buckets: int = 10000,
+        **options: float
+    ) -> None:
+        self.rate: float = rate
+        self.burst: int = burst
+        self.limits: Dict[str, Tuple[float, int]] = dict(limits or {})
+        self.max_buckets: int = max_buckets
+        self.options: Dict[str, float] = options
+        self._buckets: Dict[BucketKey, TokenBucket] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def bucket(self, key: BucketKey) -> TokenBucket:
+        """Get or create the bucket of a key."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self.prune()
+            rate, burst = self.limits.get(key[2], (self.rate, self.burst))
+            bucket = self._buckets[key] = TokenBucket(rate, burst, **self.options)
+        return bucket
+
+    async def acquire(self, key: BucketKey) -> None:
+        await self.bucket(key).acquire()
+
+    def throttle(self, key: BucketKey) -> None:
+        self.bucket(key).throttle()
+
+    def recover(self, key: BucketKey) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.recover()
+
+    def prune(self) -> None:
+        """Discard the idle buckets."""
+        for key in [k for k, b in self._buckets.items() if b.idle]:
+            del self._buckets[key]
+
+    def states(self) -> Dict[BucketKey, BucketState]:
+        """Current state of every bucket, for monitoring."""
+        return {key: bucket.state() for key, bucket in self._buckets.items()}
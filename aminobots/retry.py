@@ -0,0 +1,186 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from typing import (
+    Collection,
+    Optional,
+    Tuple,
+    Type
+)
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from aiohttp import ClientConnectorError
+from .errors import (
+    ConnectionError,
+    ServerError,
+    ServiceUnavailable,
+    TooManyClientRequests
+)
+
+__all__ = ('RetryPolicy',)
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a `Retry-After` header (seconds or HTTP date) to seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Represents the retry strategy of the HTTP client.
+
+    The delay between tries grows exponentially with full jitter, so many clients
+    failing at the same time don't retry at the same time.
+
+    Parameters
+    ----------
+    tries : :class:`int`, optional
+        Maximum number of tries, including the first request.
+    base : :class:`float`, optional
+        Delay in seconds of the first retry (before jitter).
+    cap : :class:`float`, optional
+        Maximum delay in seconds between two tries.
+    max_elapsed : :class:`float` | `None`, optional
+        Give up when the next try would start after these seconds. `None` disables it.
+    jitter : :class:`bool`, optional
+        Pick a random delay between `0` and the exponential delay.
+    retry_after : :class:`bool`, optional
+        Honor the `Retry-After` header of `429` and `503` responses.
+    retry_on : `tuple` of exception types, optional
+        Errors retried on idempotent requests.
+    retry_on_unsafe : `tuple` of exception types, optional
+        Errors retried on non-idempotent requests (POST), only errors
+        raised before the server processed the request.
+    idempotent_methods : `Collection` of :class:`str`, optional
+        HTTP methods that are safe to repeat.
+
+    Examples
+    --------
+    >>> amino = Amino(retry=RetryPolicy(tries=3, max_elapsed=10))
+    >>> amino = Amino(retry=RetryPolicy.never())
+
+    """
+
+    def __init__(
+        self,
+        *,
+        tries: int = 5,
+        base: float = 0.5,
+        cap: float = 30.0,
+        max_elapsed: Optional[float] = 60.0,
+        jitter: bool = True,
+        retry_after: bool = True,
+        retry_on: Tuple[Type[BaseException], ...] = (ConnectionError, ServerError, TooManyClientRequests),
+        retry_on_unsafe: Tuple[Type[BaseException], ...] = (TooManyClientRequests, ServiceUnavailable),
+        idempotent_methods: Collection[str] = IDEMPOTENT_METHODS
+    ) -> None:
+        if tries < 1:
+            raise ValueError('tries must be greater than 0.')
+        self.tries: int = tries
+        self.base: float = base
+        self.cap: float = cap
+        self.max_elapsed: Optional[float] = max_elapsed
+        self.jitter: bool = jitter
+        self.retry_after: bool = retry_after
+        self.retry_on: Tuple[Type[BaseException], ...] = retry_on
+        self.retry_on_unsafe: Tuple[Type[BaseException], ...] = retry_on_unsafe
+        self.idempotent_methods: frozenset = frozenset(m.upper() for m in idempotent_methods)
+
+    def __repr__(self) -> str:
+        return '%s(tries=%d, base=%r, cap=%r, max_elapsed=%r)' % (
+            type(self).__name__, self.tries, self.base, self.cap, self.max_elapsed)
+
+    @classmethod
+    def never(cls) -> RetryPolicy:
+        """Policy that never retries."""
+        return cls(tries=1)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay in seconds before the retry number `attempt` (starting at `0`)."""
+        delay = min(self.cap, self.base * 2 ** attempt)
+        return uniform(0, delay) if self.jitter else delay
+
+    def retryable(self, method: str, error: BaseException, idempotent: Optional[bool] = None) -> bool:
+        """Check if the request can be sent again after `error`."""
+        if idempotent is None:
+            idempotent = method.upper() in self.idempotent_methods
+        if idempotent:
+            return isinstance(error, self.retry_on)
+        if isinstance(error, ConnectionError):
+            # the connection was never established, the request was not sent
+            return isinstance(error.__cause__, ClientConnectorError)
+        return isinstance(error, self.retry_on_unsafe)
+
+    def delay(
+        self,
+        method: str,
+        error: BaseException,
+        attempt: int,
+        elapsed: float,
+        idempotent: Optional[bool] = None
+    ) -> Optional[float]:
+        """Compute the delay before the next try.
+
+        Parameters
+        ----------
+        method : :class:`str`
+            HTTP method of the failed request.
+        error : :class:`Exception`
+            The error of the failed try.
+        attempt : :class:`int`
+            Number of retries already made.
+        elapsed : :class:`float`
+            Seconds elapsed since the first try.
+        idempotent : :class:`bool` | `None`
+            Override the idempotency of the method.
+
+        Returns
+        -------
+        float | None
+            Seconds to wait, or `None` if the request must not be retried.
+
+        """
+        if attempt + 1 >= self.tries or not self.retryable(method, error, idempotent):
+            return None
+        retry_after = getattr(error, 'retry_after', None)
+        if self.retry_after and retry_after is not None:
+            delay = retry_after
+        else:
+            delay = self.backoff(attempt)
+        if self.max_elapsed is not None and elapsed + delay > self.max_elapsed:
+            return None
+        return delay
@@ -0,0 +1,408 @@
+"""MIT License
+
+Copyright (c) 2022 ViktorSky
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from __future__ import annotations
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Counter,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union
+)
+from asyncio import gather, sleep
+from collections import Counter as _Counter, deque
+from datetime import datetime, timezone
+from inspect import isawaitable
+from random import Random
+from re import compile, escape
+from time import perf_counter
+from aiohttp import WSMsgType, web
+from .codec import JSONDecodeError, dumps, loads
+from yarl import URL
+from .utils import signature
+
+__all__ = ('FakeAmino', 'FakeRequest', 'Fault')
+
+PARAM_PATTERN = compile(r'\{(\w+)\}')
+NDC_PATTERN = compile(r'^/api/v1/(?:g/s-x(?P<scope>\d+)|x(?P<comId>\d+)/s|g/s)/(?P<path>.*)$')
+
+Response = Union[Dict[str, Any], Callable[['FakeRequest'], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]]]
+
+
+def api_response(statuscode: int = 0, message: str = 'OK', duration: float = 0.0, **data: Any) -> Dict[str, Any]:
+    """Return a response body with the `api:*` keys of the Amino API."""
+    return {
+        'api:statuscode': statuscode,
+        'api:message': message,
+        'api:duration': '%.3fs' % duration,
+        'api:timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        **data
+    }
+
+
+class FakeRequest(NamedTuple):
+    """Represents a request received by :class:`FakeAmino`."""
+    method: str
+    path: str
+    comId: int
+    scope: int
+    params: Dict[str, str]
+    json: Optional[Dict[str, Any]]
+    headers: Dict[str, str]
+    match: Dict[str, str]
+
+
+class Fault:
+    """Represents an injected failure of :class:`FakeAmino`.
+
+    Parameters
+    ----------
+    status : :class:`int` | `None`, optional
+        HTTP status of the response (e.g. `429` or `503`). The body is plain text.
+    statuscode : :class:`int` | `None`, optional
+        `api:statuscode` of a JSON response (e.g. `219`).
+    message : :class:`str`, optional
+        `api:message` or text body of the response.
+    path : :class:`str` | `None`, optional
+        Only requests whose path starts with this prefix fail. `None` matches all.
+    times : :class:`int` | `None`, optional
+        Number of requests that fail. `None` means forever.
+    rate : :class:`float`, optional
+        Probability of failure of each matching request.
+    retry_after : :class:`float` | `None`, optional
+        Value of the `Retry-After` header.
+    latency : :class:`float`, optional
+        Additional seconds before responding.
+
+    """
+
+    __slots__ = ('status', 'statuscode', 'message', 'path', 'times', 'rate', 'retry_after', 'latency')
+
+    def __init__(
+        self,
+        status: Optional[int] = None,
+        statuscode: Optional[int] = None,
+        message: str = 'Injected fault.',
+        *,
+        path: Optional[str] = None,
+        times: Optional[int] = 1,
+        rate: float = 1.0,
+        retry_after: Optional[float] = None,
+        latency: float = 0.0
+    ) -> None:
+        self.status = status
+        self.statuscode = statuscode
+        self.message = message
+        self.path = path.removeprefix('/') if path is not None else None
+        self.times = times
+        self.rate = rate
+        self.retry_after = retry_after
+        self.latency = latency
+
+    def __repr__(self) -> str:
+        return '{}(status={!r}, statuscode={!r}, path={!r}, times={!r}, rate={!r})'.format(
+            type(self).__name__, self.status, self.statuscode, self.path, self.times, self.rate)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.times is not None and self.times <= 0
+
+    def matches(self, path: str) -> bool:
+        return self.path is None or path.startswith(self.path)
+
+    def response(self, started: float) -> web.Response:
+        headers = {}
+        if self.retry_after is not None:
+            headers['Retry-After'] = '%g' % self.retry_after
+        if self.statuscode is not None:
+            return web.Response(
+                status=self.status or 200,
+                text=dumps(api_response(self.statuscode, self.message, perf_counter() - started)),
+                content_type='application/json',
+                headers=headers
+            )
+        if self.status is not None:
+            return web.Response(status=self.status, text=self.message, headers=headers)
+        raise ValueError('fault without status or statuscode.')
+
+
+class FakeAmino:
+    """A local stand-in of the Amino API for load and integration testing.
+
+    Serves the `g/s/`, `x{comId}/s/` and `g/s-x{scope}/` routes used by
+    :meth:`HTTPClient.request` and a websocket for :class:`WSClient` on
+    `ws1`...`ws4`. Unrouted requests answer `api:statuscode` `100`.
+
+    .. code-block:: python3
+
+        async with FakeAmino(latency=0.01) as fake, Amino() as amino:
+            fake.bind(amino)
+            fake.route('GET', 'user-profile/{userId}', {'userProfile': {...}})
+            fake.inject(Fault(status=503, times=2))
+            await amino.get_user_info(userId)
+
+    Parameters
+    ----------
+    latency : :class:`float`, optional
+        Seconds before every response.
+    jitter : :class:`float`, optional
+        Random additional seconds (between `0` and `jitter`) before every response.
+    verify_signature : :class:`bool`, optional
+        Reject requests with a body whose `NDC-MSG-SIG` doesn't match it.
+    history : :class:`int`, optional
+        Number of received requests and websocket frames kept in memory.
+    seed : :class:`int` | `None`, optional
+        Seed of the random faults and jitter.
+    host : :class:`str`, optional
+        Address to listen on. The port is picked by the system.
+
+    Attributes
+    ----------
+    requests : :class:`collections.deque`
+        The last received :class:`FakeRequest`.
+    frames : :class:`collections.deque`
+        The last frames sent by websocket clients.
+    stats : :class:`collections.Counter`
+        Counters of requests, faults, invalid signatures and websocket frames.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        verify_signature: bool = True,
+        history: int = 1000,
+        seed: Optional[int] = None,
+        host: str = '127.0.0.1'
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.verify_signature = verify_signature
+        self.host = host
+        self.port = 0
+        self.requests: Deque[FakeRequest] = deque(maxlen=history)
+        self.frames: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.stats: Counter[str] = _Counter()
+        self.faults: List[Fault] = []
+        self.websockets: Set[web.WebSocketResponse] = set()
+        self.rejected_handshakes = 0
+        self._random = Random(seed)
+        self._routes: List[Tuple[str, Pattern[str], Response]] = []
+        self._runner: Optional[web.AppRunner] = None
+
+    async def __aenter__(self) -> 'FakeAmino':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def url(self) -> URL:
+        """Base url to use as :attr:`HTTPClient.BASE`."""
+        return URL.build(scheme='http', host=self.host, port=self.port, path='/api/v1/')
+
+    @property
+    def ws_base(self) -> str:
+        """Url template to use as :attr:`WSClient.BASE`."""
+        return f'ws://{self.host}:{self.port}/ws%d'
+
+    def bind(self, amino: Any) -> None:
+        """Point the http and websocket clients of an :class:`Amino` to this server."""
+        amino.http.BASE = self.url
+        amino.ws.BASE = self.ws_base
+
+    def route(self, method: str, path: str, response: Response) -> None:
+        """Register a response.
+
+        Parameters
+        ----------
+        method : :class:`str`
+            HTTP method, e.g. `GET`.
+        path : :class:`str`
+            Path relative to the ndc prefix. `{name}` matches one segment,
+            available in :attr:`FakeRequest.match`.
+        response : :class:`dict` | `Callable`
+            The response body, or a (async) function taking the
+            :class:`FakeRequest` and returning it. The `api:*` keys are added
+            when missing.
+
+        """
+        parts = PARAM_PATTERN.split(path.removeprefix('/'))
+        # split() alternates literal text and parameter names
+        pattern = compile('^%s$' % ''.join(
+            f'(?P<{part}>[^/]+)' if index % 2 else escape(part) for index, part in enumerate(parts)))
+        self._routes.insert(0, (method.upper(), pattern, response))
+
+    def inject(self, fault: Fault) -> Fault:
+        """Add a fault. Faults are checked in the order they were injected."""
+        self.faults.append(fault)
+        return fault
+
+    def reject_websocket(self, times: int = 1) -> None:
+        """Refuse the next websocket handshakes with `503`."""
+        self.rejected_handshakes += times
+
+    async def start(self) -> None:
+        """Start listening."""
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_route('GET', '/ws{n:\\d*}', self._websocket)
+        app.router.add_route('GET', '/', self._websocket)
+        app.router.add_route('*', '/api/v1/{tail:.*}', self._http)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        """Close the websockets and stop listening."""
+        if self._runner is None:
+            return
+        await self.disconnect()
+        await self._runner.cleanup()
+        self._runner = None
+
+    async def send(self, frame: Dict[str, Any]) -> int:
+        """Send a frame to every connected websocket. Returns the number of sockets."""
+        data = dumps(frame)
+        sockets = [ws for ws in self.websockets if not ws.closed]
+        await gather(*(ws.send_str(data) for ws in sockets), return_exceptions=True)
+        return len(sockets)
+
+    async def disconnect(self, code: int = 1001) -> None:
+        """Close every connected websocket from the server side."""
+        await gather(*(ws.close(code=code) for ws in list(self.websockets)), return_exceptions=True)
+        self.websockets.clear()
+
+    def _fault(self, path: str) -> Optional[Fault]:
+        for fault in self.faults:
+            if fault.exhausted or not fault.matches(path):
+                continue
+            if fault.rate < 1.0 and self._random.random() >= fault.rate:
+                continue
+            if fault.times is not None:
+                fault.times -= 1
+            return fault
+        return None
+
+    async def _delay(self, extra: float = 0.0) -> None:
+        delay = self.latency + extra
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        if delay > 0:
+            await sleep(delay)
+
+    async def _http(self, request: web.Request) -> web.StreamResponse:
+        started = perf_counter()
+        self.stats['requests'] += 1
+        match = NDC_PATTERN.match(request.path)
+        if match is None:
+            return web.Response(status=404, text='Not Found')
+        path = match['path']
+        body = await request.read()
+        if body and self.verify_signature and request.headers.get('NDC-MSG-SIG') != signature(body):
+            self.stats['invalid_signatures'] += 1
+            await self._delay()
+            return web.json_response(api_response(104, 'Invalid Request.', perf_counter() - started), dumps=dumps)
+        try:
+            json = loads(body) if body else None
+        except JSONDecodeError:
+            json = None
+        fake = FakeRequest(
+            method=request.method,
+            path=path,
+            comId=int(match['comId'] or 0),
+            scope=int(match['scope'] or 0),
+            params=dict(request.query),
+            json=json,
+            headers=dict(request.headers),
+            match={}
+        )
+        self.requests.append(fake)
+        fault = self._fault(path)
+        if fault is not None:
+            self.stats['faults'] += 1
+            await self._delay(fault.latency)
+            if fault.status is not None or fault.statuscode is not None:
+                return fault.response(started)
+        else:
+            await self._delay()
+        for method, pattern, response in self._routes:
+            if method != request.method:
+                continue
+            route_match = pattern.match(path)
+            if route_match is None:
+                continue
+            fake = fake._replace(match=route_match.groupdict())
+            if callable(response):
+                data = response(fake)
+                if isawaitable(data):
+                    data = await data
+            else:
+                data = response
+            return web.json_response(
+                {**api_response(duration=perf_counter() - started), **data},
+                dumps=dumps
+            )
+        self.stats['unrouted'] += 1
+        return web.json_response(api_response(
+            100, 'Unsupported service. Your client may be out of date.', perf_counter() - started), dumps=dumps)
+
+    async def _websocket(self, request: web.Request) -> web.StreamResponse:
+        self.stats['handshakes'] += 1
+        await self._delay()
+        if self.rejected_handshakes > 0:
+            self.rejected_handshakes -= 1
+            return web.Response(status=503, text='Service Unavailable')
+        signbody = request.query.get('signbody')
+        if signbody is not None and self.verify_signature \
+                and request.headers.get('NDC-MSG-SIG') != signature(signbody):
+            self.stats['invalid_signatures'] += 1
+            return web.Response(status=403, text='Forbidden')
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.websockets.add(ws)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                self.stats['frames'] += 1
+                try:
+                    self.frames.append(loads(msg.data))
+                except JSONDecodeError:
+                    pass
+        finally:
+            self.websockets.discard(ws)
+        return ws
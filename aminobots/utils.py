@@ -29,13 +29,15 @@ import datetime
 import inspect
 import hashlib
 import typing
+import types
 import base64
-import ujson
 import hmac
 import time
 import re
 import os
 
+from . import codec
+
 __all__ = (
     'active_time',
     'build_url',
@@ -49,6 +51,7 @@ __all__ = (
     'parse_annotations',
     'parse_time',
     'SID',
+    'Signer',
     'signature',
     'suppress',
     'typechecker',
@@ -60,6 +63,10 @@ SIGKEY = 'DFA5ED192DDA6E88A12FE12130DC6206B1251E44'
 
 FMT_TIME = '%Y-%m-%dT%H:%M:%SZ'
 
+# typechecker: the environment variable removes the decorator, TYPECHECK skips the checks at runtime.
+TYPECHECK_ENABLED: bool = os.environ.get('AMINOBOTS_TYPECHECK', '1').lower() not in ('0', 'false', 'no', 'off')
+TYPECHECK: bool = TYPECHECK_ENABLED
+
 
 if not typing.TYPE_CHECKING:
     class _Missing:
@@ -160,8 +167,8 @@ class SID(str):
             decoded: bytes = base64.urlsafe_b64decode(
                 sid + "=" * (4 - len(sid) % 4)
             )
-            data: dict = ujson.loads(decoded[1:-20].decode("utf-8"))
-        except (TypeError, UnicodeDecodeError, ujson.JSONDecodeError) as exc:
+            data: dict = codec.loads(decoded[1:-20])
+        except (TypeError, UnicodeDecodeError, codec.JSONDecodeError) as exc:
             raise ValueError('invalid sid.') from exc
         self.json = data
         self.key = decoded[-20:].hex()
@@ -209,6 +216,57 @@ class Device(str):
         return bytes.fromhex(self)[1:21]
 
 
+class Signer:
+    """HMAC-SHA1 signer of the Amino API.
+
+    The key is processed once, each signature only copies the keyed state.
+
+    Parameters
+    ----------
+    key : :class:`str`
+        The HMAC key in hexadecimal.
+    prefix : :class:`str`, optional
+        Version prefix of the signatures in hexadecimal.
+
+    Examples
+    --------
+    ```
+    >>> signer = Signer(SIGKEY)
+    >>> signer.sign('{"timestamp": 0}')
+    'GZ...'
+    >>> signer.sign_many(bodies)
+    ['GZ...', ...]
+    ```
+    """
+
+    __slots__ = ('prefix', '_hmac')
+
+    def __init__(self, key: str, prefix: str = PREFIX) -> None:
+        self.prefix: bytes = bytes.fromhex(prefix)
+        self._hmac = hmac.new(bytes.fromhex(key), digestmod=hashlib.sha1)
+
+    def mac(self, data: bytes) -> bytes:
+        """The raw HMAC of the data."""
+        state = self._hmac.copy()
+        state.update(data)
+        return state.digest()
+
+    def sign(self, data: typing.Union[str, bytes]) -> str:
+        """The base64 signature (prefix + HMAC) of the data."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return base64.b64encode(self.prefix + self.mac(data)).decode('ascii')
+
+    def sign_many(self, bodies: typing.Iterable[typing.Union[str, bytes]]) -> typing.List[str]:
+        """Sign many bodies at once."""
+        sign = self.sign
+        return [sign(data) for data in bodies]
+
+
+SIGNER = Signer(SIGKEY)
+DEVICE_SIGNER = Signer(DEVKEY)
+
+
 @typing.overload
 def device_gen() -> Device:
     ...
@@ -230,34 +288,24 @@ def device_gen(id: typing.Optional[bytes] = None) -> Device:
         The device ID in bytes.
 
     """
-    info: bytes = bytes.fromhex(PREFIX) + (id or os.urandom(20))
-    device: bytes = info + hmac.new(
-        bytes.fromhex(DEVKEY),
-        info, hashlib.sha1
-    ).digest()
-    return Device(device.hex())
+    info: bytes = DEVICE_SIGNER.prefix + (id or os.urandom(20))
+    return Device((info + DEVICE_SIGNER.mac(info)).hex())
 
 
 def update_device(device: typing.Union[str, Device], /) -> Device:
     return device_gen(bytes.fromhex(device)[1:21])
 
 
-def signature(data: str) -> str:
+def signature(data: typing.Union[str, bytes]) -> str:
     """Amino signature generator.
 
     Parameters
     ----------
-    data : :class:`str`
+    data : :class:`str` | `bytes`
         The data to encode.
 
     """
-    info: bytes = data.encode("utf-8")
-    return base64.b64encode(
-        bytes.fromhex(PREFIX) + hmac.new(
-            bytes.fromhex(SIGKEY),
-            info, hashlib.sha1
-        ).digest()
-    ).decode("utf-8")
+    return SIGNER.sign(data)
 
 
 def build_url(path: str, *, fragment: typing.Optional[str] = None, **params: typing.Any) -> str:
@@ -283,10 +331,41 @@ def match_arguments(func, *args, **kwargs) -> typing.OrderedDict[str, typing.Any
     return arguments.arguments
 
 
+def _runtime_types(annotation: typing.Any) -> typing.Optional[typing.Tuple[type, ...]]:
+    """Classes accepted by an annotation, `None` if it can't be checked with isinstance."""
+    if annotation is None or annotation is type(None):
+        return (type(None),)
+    if annotation is typing.Any or isinstance(annotation, (str, typing.TypeVar, typing.ForwardRef)):
+        return None
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union or origin is types.UnionType:
+        result: typing.Tuple[type, ...] = ()
+        for arg in typing.get_args(annotation):
+            arg_types = _runtime_types(arg)
+            if arg_types is None:
+                return None
+            result += arg_types
+        return result
+    if origin is not None:
+        # List[int] -> list, the items are not checked
+        return (origin,) if isinstance(origin, type) else None
+    return (annotation,) if isinstance(annotation, type) else None
+
+
+def _type_name(types: typing.Tuple[type, ...]) -> str:
+    return ' | '.join('None' if t is type(None) else t.__qualname__ for t in types)
+
+
 def typechecker(func):
     """Decorator for type checking.
 
     It is used to check the type of arguments passed to the callable, when it is called.
+    The annotations are resolved once, when the callable is decorated. `Optional` and
+    `Union` are supported, generic types are checked by their origin (`List[int]` -> `list`).
+
+    The checks are disabled with the `AMINOBOTS_TYPECHECK=0` environment variable, the
+    callable is returned undecorated (zero cost). At runtime they can be disabled by
+    setting :data:`TYPECHECK` to `False`.
 
     Parameters
     ----------
@@ -299,32 +378,52 @@ def typechecker(func):
         The function decorated.
 
     """
-    @functools.wraps(func)
-    async def async_inner(*args, **kwargs):
-        annotations = parse_annotations(func)
-        arguments = match_arguments(func, *args, **kwargs)
-        for name, value in arguments.items():
-            if annotations[name] is MISSING:
-                continue
-            if not isinstance(value, annotations[name]):
-                raise TypeError('%r argument must be %r type not %r.' % (name, annotations[name].__qualname__, type(value).__name__))
-        return await func(*args, **kwargs)
+    if not TYPECHECK_ENABLED:
+        return func
+    signature = inspect.signature(func)
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:
+        hints = {}
+    checks: typing.List[typing.Tuple[int, str, typing.Tuple[type, ...]]] = []
+    for index, (name, parameter) in enumerate(signature.parameters.items()):
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        annotation = hints.get(name, parameter.annotation)
+        if annotation is parameter.empty:
+            continue
+        types_ = _runtime_types(annotation)
+        if types_ is None:
+            continue
+        position = index if parameter.kind is not parameter.KEYWORD_ONLY else -1
+        checks.append((position, name, types_))
+
+    def check(args, kwargs) -> None:
+        for position, name, types_ in checks:
+            if -1 < position < len(args):
+                value = args[position]
+            elif name in kwargs:
+                value = kwargs[name]
+            else:
+                continue  # default value
+            if not isinstance(value, types_):
+                raise TypeError('%r argument must be %r type not %r.' % (name, _type_name(types_), type(value).__name__))
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_inner(*args, **kwargs):
+            if TYPECHECK:
+                check(args, kwargs)
+            return await func(*args, **kwargs)
+        async_inner.__signature__ = signature # type: ignore
+        return async_inner
+
     @functools.wraps(func)
     def inner(*args, **kwargs):
-        annotations = parse_annotations(func)
-        arguments = match_arguments(func, *args, **kwargs)
-        for name, value in arguments.items():
-            if annotations[name] is MISSING:
-                continue
-            if not isinstance(value, annotations[name]):
-                raise TypeError('%r argument must be %r type not %r.' % (name, annotations[name].__qualname__, type(value).__name__))
+        if TYPECHECK:
+            check(args, kwargs)
         return func(*args, **kwargs)
-    if inspect.iscoroutinefunction(func):
-        async_inner.__doc__ = func.__doc__
-        async_inner.__signature__ = inspect.signature(func) # type: ignore    
-        return async_inner
-    inner.__doc__ = func.__doc__
-    inner.__signature__ = inspect.signature(func) # type: ignore
+    inner.__signature__ = signature # type: ignore
     return inner
 
 
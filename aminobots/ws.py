@@ -20,26 +20,78 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import collections
 import aiohttp
 import asyncio
 import typing
-import ujson
 import yarl
 import time
 
 from . import (
     abc,
+    codec,
     enums,
     utils,
     errors
 )
+from .eventqueue import EventKey, EventQueue, event_key
+from .executor import KeyedExecutor
+from .retry import RetryPolicy
 
 if typing.TYPE_CHECKING:
     from . import amino
+    from .objects import CompactChatMessage
 
-__all__ = ('WSClient',)
+__all__ = ('WSClient', 'WSEvent')
 
-CONNECTION_TRIES = 4
+ENDPOINTS = 4  # ws1 to ws4
+CHAT = enums.EventType.CHAT.value
+
+Handler = typing.Callable[['WSEvent'], typing.Awaitable[typing.Any]]
+
+
+class WSEvent:
+    """A frame received by the websocket, as passed to the handlers.
+
+    Attributes
+    ----------
+    t : :class:`int`
+        The frame type, see :class:`~aminobots.enums.EventType`.
+    key : :class:`str`
+        The dispatch key, `t` or `t:type:mediaType` for chat frames.
+    data : :class:`dict`
+        The frame object (`o`).
+
+    """
+    __slots__ = ('t', 'key', 'data', '_message')
+
+    def __init__(self, t: int, key: str, data: typing.Dict[str, typing.Any]) -> None:
+        self.t = t
+        self.key = key
+        self.data = data
+        self._message = None
+
+    def __repr__(self) -> str:
+        return '<WSEvent key=%r>' % self.key
+
+    @property
+    def comId(self) -> typing.Optional[int]:
+        """The community ID of the frame."""
+        return self.data.get('ndcId')
+
+    @property
+    def chatId(self) -> typing.Optional[str]:
+        """The chat ID of a chat frame."""
+        message = self.data.get('chatMessage')
+        return message.get('threadId') if message else self.data.get('threadId')
+
+    @property
+    def message(self) -> typing.Optional['CompactChatMessage']:
+        """The message of a chat frame, built on first access."""
+        if self._message is None and self.t == CHAT:
+            from .objects import CompactChatMessage
+            self._message = CompactChatMessage.from_dict(self.data.get('chatMessage') or {})
+        return self._message
 
 
 class Action:
@@ -48,10 +100,10 @@ class Action:
         self.json = json
 
     async def __aenter__(self):
-        await self.ws.client.send_json({**self.json, 't': 306})
+        await self.ws.client.send_json({**self.json, 't': 306}, dumps=codec.dumps)
 
     async def __aexit__(self, *error):
-        await self.ws.client.send_json({**self.json, 't': 303})
+        await self.ws.client.send_json({**self.json, 't': 303}, dumps=codec.dumps)
 
 
 @utils.copy_all_docs
@@ -63,6 +115,18 @@ class WSClient(abc.ABCWSClient):
     def __init__(self, amino: 'amino.Amino') -> None:
         self.client = None
         self.amino = amino
+        self.handlers: typing.Dict[str, typing.List[Handler]] = {}
+        self.stats: typing.Counter[str] = collections.Counter()
+        self.queue: EventQueue = EventQueue()
+        self.executor: typing.Optional[KeyedExecutor] = KeyedExecutor()
+        self.consumers: int = 1
+        self._consumers: typing.List[asyncio.Task] = []
+        self.retry: RetryPolicy = RetryPolicy(base=1.0, cap=60.0)
+        self.endpoint: int = 0
+        self.state: enums.WebSocketState = enums.WebSocketState.CLOSED
+        self._closing = asyncio.Event()
+        self._ready = asyncio.Event()
+        self._task: typing.Optional[asyncio.Task] = None
 
     def __dir__(self) -> typing.Iterable:
         return set(object.__dir__(self)) - {'amino'}
@@ -70,147 +134,314 @@ class WSClient(abc.ABCWSClient):
     @property
     def closed(self) -> bool:
         """Websocket closed."""
-        return not (isinstance(self.client, aiohttp.ClientWebSocketResponse) and self.client.closed)
-
-    @staticmethod
-    async def get_token(sid: str) -> typing.Optional[str]:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                'https://aminoapps.com/api/chat/web-socket-url',
-                headers=dict(cookie=f'sid={sid}')
-            ) as response:
-                try:
-                    token = (await response.json())['result']['url']
-                except (KeyError, ujson.JSONDecodeError):
-                    token = None
-                return token
-
-    async def connect(self, token_url: typing.Optional[str] = None) -> None:
-        session: aiohttp.ClientSession = None
-        while self.amino.sid or token_url:
-            params, headers = {}, {
-                'NDCDEVICEID': self.amino.device,
-                'NDCAUTH': self.amino.sid,
-                'Content-Type': 'text/plain',
-                'Host': 'aminoapps.com',
-                'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36',
-                'accept': '*/*',
-                'accept-language': 'en-US,en;q=0.9',
-                'referer': 'https://aminoapps.com/partial/main-chat-window?ndcId=86797652&source=sidebar_community_list&action=click'
-            }
-
-            # 'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36',
-            # 'accept': '*/*',
-            # 'referer': 'https://aminoapps.com/partial/main-chat-window?ndcId=86797652&source=sidebar_community_list&action=click',
-            # 'accept-language': 'en-US,en;q=0.9',
-
-            if not token_url:
-                timestamp = int(time.time() * 1000)
-                data = f'{self.amino.device}|{timestamp}'
-                headers.update({'NDC-MSG-SIG': utils.signature(data)})
-                params.update(signbody=data)
+        return self.client is None or self.client.closed
+
+    def add_handler(self, event: EventKey, handler: Handler) -> None:
+        """Register an async handler for a frame type or a chat event.
+
+        A handler of :attr:`EventType.CHAT` receives every chat frame, a handler
+        of a :class:`ChatEvent` only the frames of that message type.
+        """
+        if not asyncio.iscoroutinefunction(handler):
+            raise TypeError('websocket handlers must be coroutine functions, not %r' % handler)
+        self.handlers.setdefault(event_key(event), []).append(handler)
+
+    def remove_handler(self, event: EventKey, handler: Handler) -> None:
+        """Unregister a handler, does nothing if it is not registered."""
+        key = event_key(event)
+        handlers = self.handlers.get(key, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self.handlers.pop(key, None)
+
+    def event(self, event: EventKey) -> typing.Callable[[Handler], Handler]:
+        """Decorator version of :meth:`add_handler`.
+
+        Examples
+        --------
+        >>> @amino.ws.event(ChatEvent.TEXT_MESSAGE)
+        ... async def on_text(event):
+        ...     print(event.message.content)
+
+        """
+        def decorator(handler: Handler) -> Handler:
+            self.add_handler(event, handler)
+            return handler
+        return decorator
+
+    async def dispatch(self, data: typing.Union[str, bytes]) -> int:
+        """Decode a text frame and call its handlers, returns the number of handlers called.
+
+        The handlers of the chat event are called before the handlers of the
+        frame type. The exception of a handler is logged and does not stop
+        the other handlers.
+        """
+        event = self.decode(data)
+        if event is None:
+            return 0
+        return await self.dispatch_event(event)
+
+    def decode(self, data: typing.Union[str, bytes]) -> typing.Optional[WSEvent]:
+        """Decode a text frame, `None` if it is invalid or has no handlers."""
+        stats = self.stats
+        stats['frames'] += 1
+        try:
+            frame = codec.loads(data)
+            t = frame['t']
+            o = frame.get('o') or {}
+            if not isinstance(o, dict):
+                raise TypeError('frame data must be an object, not %s' % type(o).__name__)
+            message = (o.get('chatMessage') or {}) if t == CHAT else {}
+            if not isinstance(message, dict):
+                raise TypeError('chatMessage must be an object, not %s' % type(message).__name__)
+        except (codec.JSONDecodeError, KeyError, TypeError):
+            stats['invalid'] += 1
+            self.amino.logger.debug('websocket invalid frame: %r', data[:100])
+            return None
+        key = str(t)
+        if t == CHAT:
+            chat_key = '%d:%s:%s' % (t, message.get('type'), message.get('mediaType'))
+            if key in self.handlers or chat_key in self.handlers:
+                return WSEvent(t, chat_key, o)
+        elif key in self.handlers:
+            return WSEvent(t, key, o)
+        stats['unhandled'] += 1
+        return None
+
+    async def dispatch_event(self, event: WSEvent) -> int:
+        """Call the handlers of a decoded event, see :meth:`dispatch`."""
+        handlers = self.handlers.get(str(event.t), ())
+        if event.t == CHAT:
+            handlers = [*self.handlers.get(event.key, ()), *handlers]
+        for handler in handlers:
             try:
-                if not isinstance(session, aiohttp.ClientSession) or session.closed:
-                    session = aiohttp.ClientSession()
-                if not isinstance(self.client, aiohttp.ClientWebSocketResponse):
-                    for tries in range(1, CONNECTION_TRIES + 1):
-                        url = token_url or self.BASE % tries
-                        headers.update(HOST=yarl.URL(url).host)
-                        self.client = await session.ws_connect(
-                            url, params=params,
-                            headers=headers,
-                            proxy=self.amino.proxy
-                        )
-                        break
-                self.amino.logger.info('websocket connected.')
-                while True:
-                    msg = await self.client.receive()
-                    #self.amino.logger.debug('ws receive: %r: %s' % (msg.type, msg.data))
-                    if msg.type == aiohttp.WSMsgType.CLOSED:
-                        raise errors.WebSocketClosed
-                        #if msg.type == aiohttp.WSMsgType.TEXT:
-                    print(msg.type, msg.data)
-                        #loop = asyncio.get_running_loop()
-                        #loop.create_task(self.on_ws_message(msg))
-            except aiohttp.WSServerHandshakeError:
-                self.amino.logger.debug('websocket handshaking.')
-                await asyncio.sleep(1)
-                continue
-            except errors.WebSocketClosed:
-                self.amino.logger.info('websocket disconnected.')
-                continue
+                await handler(event)
+            except Exception:
+                self.stats['errors'] += 1
+                self.amino.logger.exception('websocket handler %r failed on %r.', handler, event)
+        self.stats['dispatched'] += 1
+        return len(handlers)
+
+    def start_consumers(self) -> None:
+        """Start the tasks that dispatch the events of :attr:`queue`, done by :meth:`connect`.
+
+        The events go through :attr:`executor`, keyed by `(ndcId, threadId)`, if it is set.
+        """
+        self._consumers = [task for task in self._consumers if not task.done()]
+        while len(self._consumers) < self.consumers:
+            self._consumers.append(asyncio.create_task(self._consume()))
+
+    async def stop_consumers(self) -> None:
+        """Cancel the consumer tasks, the queued events are kept."""
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers.clear()
+
+    async def _consume(self) -> None:
+        queue = self.queue
+        while True:
+            _, event = await queue.get()
+            try:
+                if self.executor is None:
+                    await self.dispatch_event(event)
+                else:
+                    # in order per chat, the chats run concurrently
+                    await self.executor.submit((event.comId, event.chatId), self.dispatch_event, event)
+            except Exception:
+                # the consumer must outlive any event
+                self.amino.logger.exception('websocket consumer failed on %r.', event)
             finally:
-            #except asyncio.CancelledError:
-                await session.close()
-                await self.close()
-                return
+                queue.task_done()
+
+    async def get_token(self, sid: typing.Optional[str] = None) -> typing.Optional[str]:
+        """Request the websocket url using the connection pool of the http client."""
+        async with self.amino.http.session.get(
+            'https://aminoapps.com/api/chat/web-socket-url',
+            headers=dict(cookie=f'sid={sid or self.amino.sid}'),
+            proxy=self.amino.proxy
+        ) as response:
+            try:
+                token = codec.loads(await response.read())['result']['url']
+            except (KeyError, TypeError, codec.JSONDecodeError):
+                token = None
+            return token
 
     async def connect(self, token_url: typing.Optional[str] = None) -> None:
-        session: aiohttp.ClientSession = None
-        while self.amino.sid or token_url:
-            params, headers = {}, {
-                'NDCDEVICEID': self.amino.device,
-                'NDCAUTH': self.amino.sid,
-                'Content-Type': 'text/plain'
-            }
-            if not token_url:
-                timestamp = int(time.time() * 1000)
-                data = f'{self.amino.device}|{timestamp}'
-                headers.update({'NDC-MSG-SIG': utils.signature(data)})
-                params.update(signbody=data)
-            try:
-                if not isinstance(session, aiohttp.ClientSession) or session.closed:
-                    session = aiohttp.ClientSession()
-                if not isinstance(self.client, aiohttp.ClientWebSocketResponse):
-                    for tries in range(1, CONNECTION_TRIES + 1):
-                        url = token_url or self.BASE % tries
-                        headers.update(HOST=yarl.URL(url).host)
-                        self.client = await session.ws_connect(
-                            url, params=params,
-                            headers=headers,
-                            proxy=self.amino.proxy
-                        )
+        """Connect and keep the websocket connected until :meth:`close`.
+
+        A failed handshake or a lost connection is retried after the
+        :meth:`RetryPolicy.backoff` of :attr:`retry`, rotating the endpoints
+        `ws1` to `ws4`, with a new signature on each attempt. The backoff starts
+        over once a connection receives a frame or stays up :attr:`RetryPolicy.cap`
+        seconds. The connection uses :attr:`Transport.ws_session`, outside the
+        limit of the http connections.
+
+        The state changes are dispatched as events of :class:`WebSocketState`,
+        with the `url`, the failed `attempt` count and the `error`, if any.
+
+        Parameters
+        ----------
+        token_url : :class:`str` | `None`
+            Url from :meth:`get_token`, used instead of the endpoints.
+
+        """
+        self._closing.clear()
+        attempt = 0
+        try:
+            while not self._closing.is_set() and (self.amino.sid or token_url):
+                url = token_url or self.BASE % (self.endpoint % ENDPOINTS + 1)
+                error: typing.Optional[BaseException] = None
+                await self._set_state(enums.WebSocketState.CONNECTING, url, attempt)
+                params, headers = self._handshake(url, token_url)
+                try:
+                    self.client = await self.amino.http.transport.ws_session.ws_connect(
+                        url,
+                        params=params,
+                        headers=headers,
+                        proxy=self.amino.proxy
+                    )
+                except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    error = exc
+                    self.amino.logger.debug('websocket handshake failed: %r', exc)
+                else:
+                    if self._closing.is_set():
+                        # closed during the handshake
+                        await self.client.close()
                         break
-                self.amino.logger.info('websocket connected.')
-                while True:
-                    msg = await self.client.receive()
-                    self.amino.logger.debug('ws receive: %r' % msg.type)
-                    if msg.type == aiohttp.WSMsgType.CLOSED:
-                        raise errors.WebSocketClosed
-                        #if msg.type == aiohttp.WSMsgType.TEXT:
-                    print(msg.type, msg.data)
-                        #loop = asyncio.get_running_loop()
-                        #loop.create_task(self.on_ws_message(msg))
-            except aiohttp.WSServerHandshakeError:
-                self.amino.logger.debug('websocket handshaking.')
-                await asyncio.sleep(1)
-                continue
-            except errors.WebSocketClosed:
-                self.amino.logger.info('websocket disconnected. Reconnecting in 5 seconds...')
-                await asyncio.sleep(5)  # wait for 5 minutes before trying to reconnect
-                continue
-            finally:
-                await session.close()
-                await self.close()
-                return
-
-    async def connect_daemon(self, token_url: typing.Optional[str] = None) -> None:
-        loop = asyncio.get_running_loop()
-        loop.create_task(self.connect(token_url), name='connection-task')
-        # wait the connection
-        while self.closed:
-            pass
+                    self.amino.logger.info('websocket connected.')
+                    await self._set_state(enums.WebSocketState.CONNECTED, url, attempt)
+                    self.start_consumers()
+                    frames, connected = self.stats['frames'], time.monotonic()
+                    error = await self._receive()
+                    self.amino.logger.info('websocket disconnected.')
+                    # a server dropping every connection at once keeps the backoff growing
+                    if self.stats['frames'] > frames or time.monotonic() - connected >= self.retry.cap:
+                        attempt = 0
+                if self._closing.is_set():
+                    break
+                await self._set_state(enums.WebSocketState.DISCONNECTED, url, attempt, error)
+                # the next attempt goes to another endpoint
+                self.endpoint += 1
+                delay = self.retry.backoff(attempt)
+                attempt += 1
+                try:
+                    await asyncio.wait_for(self._closing.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            # cancelled by close(), the task ends normally
+            if not self._closing.is_set():
+                raise
+        finally:
+            await self._set_state(enums.WebSocketState.CLOSED, None, attempt)
+
+    def _handshake(self, url: str, token_url: typing.Optional[str]) -> typing.Tuple[typing.Dict[str, str], typing.Dict[str, str]]:
+        """Query params and headers of a connection attempt."""
+        params, headers = {}, {
+            'NDCDEVICEID': self.amino.device,
+            'NDCAUTH': self.amino.sid,
+            'Content-Type': 'text/plain',
+            'HOST': yarl.URL(url).host
+        }
+        if not token_url:
+            # signed again on each attempt, the signbody has the timestamp
+            data = f'{self.amino.device}|{int(time.time() * 1000)}'
+            headers['NDC-MSG-SIG'] = utils.signature(data)
+            params['signbody'] = data
+        return params, headers
+
+    async def _receive(self) -> typing.Optional[BaseException]:
+        """Read the frames until the connection is lost, returns the error if any."""
+        while True:
+            msg = await self.client.receive()
+            if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED):
+                return errors.WebSocketClosed(self.client.close_code)
+            if msg.type == aiohttp.WSMsgType.ERROR:
+                return msg.data
+            await self.on_ws_message(msg)
+
+    async def _set_state(
+        self,
+        state: enums.WebSocketState,
+        url: typing.Optional[str],
+        attempt: int,
+        error: typing.Optional[BaseException] = None
+    ) -> None:
+        self.state = state
+        if state == enums.WebSocketState.CONNECTED:
+            self._ready.set()
+        else:
+            self._ready.clear()
+        if state.value in self.handlers:
+            await self.dispatch_event(WSEvent(state.value, state.value, {'url': url, 'attempt': attempt, 'error': error}))
+
+    async def connect_daemon(self, token_url: typing.Optional[str] = None, timeout: typing.Optional[float] = 30.0) -> None:
+        """Run :meth:`connect` in a background task and wait until the websocket is connected.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            Not connected after `timeout` seconds, the task keeps trying.
+        WebSocketClosed
+            The task ended before connecting (closed or no session ID).
+
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.connect(token_url), name='connection-task')
+        await self.wait_ready(timeout)
+
+    async def wait_ready(self, timeout: typing.Optional[float] = None) -> None:
+        """Wait until the websocket is connected, without polling.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            Not connected after `timeout` seconds.
+        WebSocketClosed
+            The task of :meth:`connect_daemon` ended before connecting.
+
+        """
+        if self._ready.is_set():
+            return
+        waiter = asyncio.ensure_future(self._ready.wait())
+        waiting = {waiter}
+        if self._task is not None:
+            waiting.add(self._task)
+        try:
+            await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        if self._ready.is_set():
+            return
+        if self._task is not None and self._task.done():
+            raise errors.WebSocketClosed('the websocket closed before it was ready.')
+        raise asyncio.TimeoutError
 
     async def close(self, code: int = aiohttp.WSCloseCode.OK, message: bytes = b''):
-        await self.client.close(code=code, message=message)
+        """Close the websocket and stop :meth:`connect` from reconnecting."""
+        self._closing.set()
+        task = self._task
+        if task is not None and task is not asyncio.current_task():
+            # interrupts the handshake or the backoff wait
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.stop_consumers()
+        if self.executor is not None:
+            await self.executor.close()
+        if self.client is not None:
+            await self.client.close(code=code, message=message)
 
     async def send(self, data: typing.Union[str, dict]):
-        data: str = ujson.dumps(data) if isinstance(data, dict) else data
+        data: str = codec.dumps(data) if isinstance(data, dict) else data
         self.BASE
 
     async def on_ws_message(self, msg: aiohttp.WSMessage) -> None:
-        import pprint
-        pprint.pprint(msg.json(loads=ujson.loads))
+        if msg.type == aiohttp.WSMsgType.TEXT:
+            event = self.decode(msg.data)
+            if event is not None:
+                await self.queue.put(event.key, event)
 
     @utils.typechecker
     async def create_channel(self, comId: int, chatId: str, channelType: enums.ChannelType):
@@ -222,7 +453,7 @@ class WSClient(abc.ABCWSClient):
                 'id': '2154531'
             },
             't': 112
-        })
+        }, dumps=codec.dumps)
         await self.client.send_json({
             'o': {
                 'ndcId': comId,
@@ -232,7 +463,7 @@ class WSClient(abc.ABCWSClient):
                 'id': '2154531'
             },
             't': 108
-        })
+        }, dumps=codec.dumps)
 
     @utils.typechecker
     async def join_channel(self, comId: int, chatId: str, channelJoinRole: enums.ChannelJoinRole = enums.ChannelJoinRole.VIEWER):
@@ -244,7 +475,7 @@ class WSClient(abc.ABCWSClient):
                 'id': '72446'
             },
             't': 112
-        })
+        }, dumps=codec.dumps)
 
     async def send_action(self, comId: int, chatId: str = None):
         ...
@@ -283,7 +514,7 @@ class WSClient(abc.ABCWSClient):
                 'target': f'ndc://x{comId}',
             },
             't': 304
-        })
+        }, dumps=codec.dumps)
 
     async def visiting(self):
         ...
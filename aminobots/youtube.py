@@ -28,11 +28,10 @@ import dataclasses
 import functools
 import datetime
 import typing
-import ujson
 import enum
 import re
 
-from . import utils
+from . import codec, utils
 
 __all__ = (
     'YouTube',
@@ -285,7 +284,7 @@ class YouTube:
             "Accept-Language": "en-US"
         }
         text = urllib.request.urlopen(urllib.request.Request(url, None, headers)).read().decode('utf-8')
-        return ujson.loads(re.findall(r'({"responseContext".+[^"]*});(?:[\r\n ]+)?</script>', text, re.DOTALL)[0])
+        return codec.loads(re.findall(r'({"responseContext".+[^"]*});(?:[\r\n ]+)?</script>', text, re.DOTALL)[0])
 
     def todict(self):
         return {
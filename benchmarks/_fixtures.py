@@ -0,0 +1,26 @@
+"""Recorded responses shared by the benchmarks.
+
+The files in ``benchmarks/fixtures`` keep the shape of real API responses, with
+ids, links and names anonymised. They are loaded from disk once per process.
+
+"""
+import functools
+import pathlib
+import typing
+
+import ujson
+
+FIXTURES = pathlib.Path(__file__).parent / 'fixtures'
+
+__all__ = ('FIXTURES', 'load', 'raw')
+
+
+@functools.lru_cache(maxsize=None)
+def raw(name: str) -> bytes:
+    """Return the undecoded body of the fixture ``name``."""
+    return (FIXTURES / f'{name}.json').read_bytes()
+
+
+def load(name: str) -> typing.Dict[str, typing.Any]:
+    """Return a fresh decoded copy of the fixture ``name``."""
+    return ujson.loads(raw(name))
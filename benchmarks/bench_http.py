@@ -0,0 +1,134 @@
+"""Benchmark of the :class:`aminobots.HTTPClient` hot path without network.
+
+Measures the request headers, the body encoding (enums are converted by the
+encoder, also inside lists) and a full
+:meth:`HTTPClient.request` (path, url and params building, body encoding,
+signature and response decoding) against an in-memory transport.
+
+    pip install -e . -r benchmarks/requirements.txt
+    python benchmarks/bench_http.py --fast
+
+"""
+import asyncio
+import base64
+import time
+import typing
+
+import pyperf
+import ujson
+
+import _fixtures
+from aminobots import Amino, codec, enums
+
+AUID = '3068dacc-cf34-45d3-8fb6-b3fb6d40e779'
+SID = base64.urlsafe_b64encode(bytes.fromhex('02') + ujson.dumps({
+    '0': 2, '1': None, '2': AUID, '3': 0, '4': '127.0.0.1', '5': 1672531200, '6': 100
+}).encode() + bytes(20)).decode().rstrip('=')
+OK = ujson.dumps({
+    'api:statuscode': 0,
+    'api:message': 'OK',
+    'api:duration': '0.001s',
+    'api:timestamp': '2023-01-01T00:00:00Z'
+}).encode()
+PAYLOAD = {
+    'type': enums.ChatType.PUBLIC,
+    'title': 'chat title',
+    'content': 'chat description',
+    'extensions': {
+        'language': enums.Language.ENGLISH,
+        'bm': [[enums.MediaType.IMAGE, 'http://pm1.narvii.com/1/image.jpg', None]],
+        'membersCanInvite': True,
+        'fansOnly': False
+    },
+    'inviteeUids': ['%08d-0000-0000-0000-000000000000' % i for i in range(20)]
+}
+
+
+class MemoryResponse:
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    async def __aenter__(self) -> 'MemoryResponse':
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self) -> str:
+        return self.body.decode()
+
+
+class MemorySession:
+    closed = False
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def request(self, **kwargs: typing.Any) -> MemoryResponse:
+        return MemoryResponse(self.body)
+
+
+class MemoryTransport:
+    """Answers every request with the same recorded body."""
+    closed = False
+
+    def __init__(self, body: bytes) -> None:
+        self.session = MemorySession(body)
+
+    async def close(self) -> None:
+        pass
+
+
+def client(body: bytes) -> Amino:
+    amino = Amino(transport=MemoryTransport(body))  # type: ignore
+    amino.sid, amino.auid = SID, AUID
+    return amino
+
+
+def bench_headers(loops: int, body: typing.Optional[str]) -> float:
+    amino = client(OK)
+
+    async def main() -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await amino.http.headers(body)
+        return time.perf_counter() - start
+    return asyncio.run(main())
+
+
+def bench_get(loops: int, fixture: str) -> float:
+    amino = client(_fixtures.raw(fixture))
+
+    async def main() -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await amino.http.request('GET', '/chat/thread', {
+                'type': 'joined-me', 'start': 0, 'size': 25, 'cv': enums.ChatType.PUBLIC
+            }, comId=200001)
+        return time.perf_counter() - start
+    return asyncio.run(main())
+
+
+def bench_post(loops: int) -> float:
+    amino = client(OK)
+
+    async def main() -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await amino.http.request('POST', '/chat/thread', json=dict(PAYLOAD), comId=200001)
+        return time.perf_counter() - start
+    return asyncio.run(main())
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.splitlines()[0]
+    runner.bench_time_func('headers_no_body', bench_headers, None)
+    runner.bench_time_func('headers_signed', bench_headers, '{"content": "hello", "type": 0}')
+    runner.bench_func('encode_body', codec.dumpb, PAYLOAD)
+    runner.bench_time_func('request_get_chat_members', bench_get, 'chat_members')
+    runner.bench_time_func('request_get_joined_chats', bench_get, 'joined_chats')
+    runner.bench_time_func('request_post', bench_post)
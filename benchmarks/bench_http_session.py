@@ -0,0 +1,42 @@
+"""Benchmark of :class:`aminobots.HTTPClient` against :class:`aminobots.testing.FakeAmino`.
+
+Compares a new session per request (the old behaviour, emulated by closing
+the session after every call) with the pooled keep-alive session.
+
+    pip install -e . -r benchmarks/requirements.txt
+    python benchmarks/bench_http_session.py --fast
+
+The reported value is the time of one request, requests/sec is `1 / value`.
+
+"""
+import asyncio
+import time
+
+import pyperf
+
+from aminobots import Amino
+from aminobots.testing import FakeAmino
+
+
+async def run(loops: int, pooled: bool) -> float:
+    async with FakeAmino() as fake, Amino() as amino:
+        fake.bind(amino)
+        fake.route('GET', 'community/info', {})
+        await amino.http.get('community/info')
+        start = time.perf_counter()
+        for _ in range(loops):
+            await amino.http.get('community/info')
+            if not pooled:
+                await amino.http.close()
+        return time.perf_counter() - start
+
+
+def bench(loops: int, pooled: bool) -> float:
+    return asyncio.run(run(loops, pooled))
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.splitlines()[0]
+    runner.bench_time_func('http_session_per_request', bench, False)
+    runner.bench_time_func('http_pooled_session', bench, True)
@@ -0,0 +1,35 @@
+"""Benchmark of the JSON codec on recorded payloads.
+
+Measures :mod:`aminobots.codec` against plain ujson: decoding the raw
+responses and encoding them back, as :class:`str` and as UTF-8 :class:`bytes`
+(the form sent and signed by :class:`aminobots.HTTPClient`). The codec uses
+orjson when it is installed, the backend is saved in the metadata.
+
+    pip install -e .[speed] -r benchmarks/requirements.txt
+    python benchmarks/bench_json.py --fast
+
+"""
+import pyperf
+import ujson
+
+import _fixtures
+from aminobots import codec
+
+NAMES = sorted(path.stem for path in _fixtures.FIXTURES.glob('*.json'))
+
+
+def ujson_dumpb(obj: object) -> bytes:
+    return ujson.dumps(obj).encode('utf-8')
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.splitlines()[0]
+    runner.metadata['codec'] = codec.BACKEND
+    for name in NAMES:
+        runner.bench_func(f'loads_ujson_{name}', ujson.loads, _fixtures.raw(name))
+        runner.bench_func(f'loads_codec_{name}', codec.loads, _fixtures.raw(name))
+    for name in NAMES:
+        runner.bench_func(f'dumpb_ujson_{name}', ujson_dumpb, _fixtures.load(name))
+        runner.bench_func(f'dumpb_codec_{name}', codec.dumpb, _fixtures.load(name))
+        runner.bench_func(f'dumps_codec_{name}', codec.dumps, _fixtures.load(name))
@@ -0,0 +1,75 @@
+"""Benchmark of :func:`aminobots.models.parse_model` on recorded responses.
+
+Each response is measured from an already decoded dict (model validation
+only) and from the raw body (decoding plus validation), with the trusted
+mode that builds the models without validation, and with the lazy mode that
+also defers the nested models (``lazy_touch`` reads the first item of the
+response list, as a bot checking one chat or member would).
+
+    pip install -e . -r benchmarks/requirements.txt
+    python benchmarks/bench_models.py --fast
+
+"""
+import typing
+
+import pyperf
+import ujson
+
+import _fixtures
+from aminobots.models import (
+    ChatMembers,
+    CommunityInfo,
+    JoinedChats,
+    Model,
+    UserInfo,
+    parse_model
+)
+
+MODELS: typing.Dict[str, typing.Type[Model]] = {
+    'user_info': UserInfo,
+    'community_info': CommunityInfo,
+    'joined_chats': JoinedChats,
+    'chat_members': ChatMembers,
+}
+# response lists read by the lazy_touch benchmarks
+LISTS: typing.Dict[str, str] = {
+    'joined_chats': 'chatList',
+    'chat_members': 'memberList',
+}
+
+
+def parse_raw(cls: typing.Type[Model], body: bytes, trusted: bool = False) -> Model:
+    return parse_model(cls, ujson.loads(body), trusted=trusted)
+
+
+def parse_trusted(cls: typing.Type[Model], data: typing.Dict[str, typing.Any]) -> Model:
+    return parse_model(cls, data, trusted=True)
+
+
+def parse_lazy(cls: typing.Type[Model], data: typing.Dict[str, typing.Any]) -> Model:
+    return parse_model(cls, data, lazy=True)
+
+
+def parse_lazy_touch(cls: typing.Type[Model], data: typing.Dict[str, typing.Any], field: str) -> Model:
+    model = parse_model(cls, data, lazy=True)
+    items = getattr(model, field)
+    if items:
+        items[0].dict()
+    return model
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.splitlines()[0]
+    for name, cls in MODELS.items():
+        runner.bench_func(f'parse_model_{name}', parse_model, cls, _fixtures.load(name))
+    for name, cls in MODELS.items():
+        runner.bench_func(f'parse_raw_{name}', parse_raw, cls, _fixtures.raw(name))
+    for name, cls in MODELS.items():
+        runner.bench_func(f'parse_trusted_{name}', parse_trusted, cls, _fixtures.load(name))
+    for name, cls in MODELS.items():
+        runner.bench_func(f'parse_raw_trusted_{name}', parse_raw, cls, _fixtures.raw(name), True)
+    for name, cls in MODELS.items():
+        runner.bench_func(f'parse_lazy_{name}', parse_lazy, cls, _fixtures.load(name))
+    for name, field in LISTS.items():
+        runner.bench_func(f'parse_lazy_touch_{name}', parse_lazy_touch, MODELS[name], _fixtures.load(name), field)
@@ -0,0 +1,53 @@
+"""Benchmark of the request signature.
+
+Compares the previous :func:`aminobots.utils.signature` implementation, that
+processed the key on every call, with the pre-keyed :class:`aminobots.utils.Signer`.
+
+    pip install -e . -r benchmarks/requirements.txt
+    python benchmarks/bench_signature.py --fast
+
+"""
+import base64
+import hashlib
+import hmac
+
+import pyperf
+import ujson
+
+from aminobots import utils
+
+BODY = ujson.dumps({
+    'clientType': 100,
+    'action': 'normal',
+    'email': 'user@example.com',
+    'secret': '0 password',
+    'deviceID': utils.device_gen(bytes(20)),
+    'v': 2,
+    'timestamp': 1672531200000
+})
+BODIES = [BODY] * 100
+
+
+def legacy_signature(data: str) -> str:
+    info: bytes = data.encode("utf-8")
+    return base64.b64encode(
+        bytes.fromhex(utils.PREFIX) + hmac.new(
+            bytes.fromhex(utils.SIGKEY),
+            info, hashlib.sha1
+        ).digest()
+    ).decode("utf-8")
+
+
+def legacy_many(bodies):
+    return [legacy_signature(body) for body in bodies]
+
+
+if __name__ == '__main__':
+    assert legacy_signature(BODY) == utils.signature(BODY)
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.splitlines()[0]
+    runner.bench_func('signature_legacy', legacy_signature, BODY)
+    runner.bench_func('signature_signer', utils.SIGNER.sign, BODY)
+    runner.bench_func('signature_legacy_x100', legacy_many, BODIES)
+    runner.bench_func('signature_sign_many_x100', utils.SIGNER.sign_many, BODIES)
+    runner.bench_func('device_gen', utils.device_gen)
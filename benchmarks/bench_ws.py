@@ -0,0 +1,129 @@
+"""Benchmark of the websocket frame decoding.
+
+Measures a chat message frame (``t`` 1000) through the stages of the receive
+path: text decoding, :meth:`aiohttp.WSMessage.json` and the validation of the
+:class:`aminobots.objects.ChatMessage`, or the build of the slotted
+:class:`aminobots.objects.CompactChatMessage`, and the dispatch of frames to
+the handlers of :class:`aminobots.WSClient`.
+
+    pip install -e . -r benchmarks/requirements.txt
+    python benchmarks/bench_ws.py --fast
+
+The reported value is the time of one frame, frames/sec is `1 / value`.
+The dispatch benchmarks register a handler for every chat event, plus one for
+all the chat frames, and the handler of text messages reads the content.
+``ws_queue_*`` pass the frames through the receive queue, a consumer task and
+the per-chat executor. ``ws_executor_chats`` dispatches frames of many chats to
+a handler that awaits, as a handler calling the API would.
+
+"""
+import asyncio
+import time
+
+import aiohttp
+import pyperf
+import ujson
+
+import _fixtures
+from aminobots import Amino, EventQueue, KeyedExecutor, enums
+from aminobots.objects import ChatMessage, CompactChatMessage
+
+FRAME = _fixtures.raw('ws_chat_message').decode()
+MESSAGE = aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, FRAME, None)
+TOPIC = '{"t":400,"o":{"topic":"ndtopic:x1:online-members"}}'
+CHATS = [
+    aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, FRAME.replace('03ec-43ec', '%04x-43ec' % i), None)
+    for i in range(50)
+]
+
+
+def decode_message(msg: aiohttp.WSMessage) -> ChatMessage:
+    frame = msg.json(loads=ujson.loads)
+    return ChatMessage.parse_obj(frame['o']['chatMessage'])
+
+
+def decode_compact(msg: aiohttp.WSMessage) -> CompactChatMessage:
+    frame = msg.json(loads=ujson.loads)
+    return CompactChatMessage.from_dict(frame['o']['chatMessage'])
+
+
+async def on_text(event) -> None:
+    event.message.content
+
+
+async def on_event(event) -> None:
+    pass
+
+
+def register(amino: Amino) -> None:
+    for event in enums.ChatEvent:
+        amino.ws.add_handler(event, on_text if event == enums.ChatEvent.TEXT_MESSAGE else on_event)
+    amino.ws.add_handler(enums.EventType.CHAT, on_event)
+
+
+def bench_dispatch(loops: int, frame: str) -> float:
+    async def main() -> float:
+        async with Amino() as amino:
+            register(amino)
+            dispatch = amino.ws.dispatch
+            start = time.perf_counter()
+            for _ in range(loops):
+                await dispatch(frame)
+            return time.perf_counter() - start
+    return asyncio.run(main())
+
+
+def bench_queue(loops: int, policy: str) -> float:
+    message = aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, FRAME, None)
+
+    async def main() -> float:
+        async with Amino() as amino:
+            register(amino)
+            amino.ws.queue = EventQueue(maxsize=100, policy=policy)
+            amino.ws.start_consumers()
+            start = time.perf_counter()
+            for _ in range(loops):
+                await amino.ws.on_ws_message(message)
+            await amino.ws.queue.join()
+            await amino.ws.executor.join()
+            elapsed = time.perf_counter() - start
+            await amino.ws.stop_consumers()
+            return elapsed
+    return asyncio.run(main())
+
+
+async def on_text_slow(event) -> None:
+    await asyncio.sleep(0.001)
+
+
+def bench_executor(loops: int, executor: bool) -> float:
+    async def main() -> float:
+        async with Amino() as amino:
+            amino.ws.add_handler(enums.ChatEvent.TEXT_MESSAGE, on_text_slow)
+            amino.ws.executor = KeyedExecutor() if executor else None
+            amino.ws.start_consumers()
+            start = time.perf_counter()
+            for i in range(loops):
+                await amino.ws.on_ws_message(CHATS[i % len(CHATS)])
+            await amino.ws.queue.join()
+            if executor:
+                await amino.ws.executor.join()
+            elapsed = time.perf_counter() - start
+            await amino.ws.stop_consumers()
+            return elapsed
+    return asyncio.run(main())
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.splitlines()[0]
+    runner.bench_func('ws_frame_loads', ujson.loads, FRAME)
+    runner.bench_func('ws_message_json', lambda: MESSAGE.json(loads=ujson.loads))
+    runner.bench_func('ws_chat_message', decode_message, MESSAGE)
+    runner.bench_func('ws_compact_chat_message', decode_compact, MESSAGE)
+    runner.bench_time_func('ws_dispatch_chat_message', bench_dispatch, FRAME)
+    runner.bench_time_func('ws_dispatch_unhandled', bench_dispatch, TOPIC)
+    runner.bench_time_func('ws_queue_block', bench_queue, 'block')
+    runner.bench_time_func('ws_queue_drop_oldest', bench_queue, 'drop-oldest')
+    runner.bench_time_func('ws_executor_serial', bench_executor, False)
+    runner.bench_time_func('ws_executor_chats', bench_executor, True)
@@ -0,0 +1,79 @@
+"""Memory of one million websocket chat messages.
+
+Keeps the chat messages of ``--count`` frames alive and reports the memory
+they retain, measured with :mod:`tracemalloc`, and the build time. The frames
+come from the recorded chat message, with a new message id per frame and
+the chat and author ids taken from small pools, like a busy bot would see.
+
+    pip install -e . -r benchmarks/requirements.txt
+    python benchmarks/bench_ws_memory.py
+    python benchmarks/bench_ws_memory.py --count 100000 --kind compact
+
+``model`` is :class:`aminobots.objects.ChatMessage` validated by pydantic,
+``trusted`` the same model built by :func:`aminobots.models.construct_model`
+and ``compact`` the slotted :class:`aminobots.objects.CompactChatMessage`.
+
+This script is not a pyperf benchmark: run each kind once, tracemalloc
+makes the times about twice slower than without it.
+
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import typing
+
+import ujson
+
+import _fixtures
+from aminobots.models import construct_model
+from aminobots.objects import ChatMessage, CompactChatMessage
+
+KINDS: typing.Dict[str, typing.Callable[[dict], typing.Any]] = {
+    'model': ChatMessage.parse_obj,
+    'trusted': lambda data: construct_model(ChatMessage, data),
+    'compact': CompactChatMessage.from_dict,
+}
+CHATS = 50
+AUTHORS = 500
+
+
+def frames(count: int) -> typing.Iterator[str]:
+    """Yield `count` frames that differ in message, chat and author ids."""
+    frame = _fixtures.load('ws_chat_message')
+    message = frame['o']['chatMessage']
+    for i in range(count):
+        author = '1a2b%04x-0000-4000-8000-5e0000000000' % (i % AUTHORS)
+        message['messageId'] = '1a2b%08x-0000-5000-9000-5e0000000000' % i
+        message['threadId'] = '1a2b%04x-03ec-43ec-83ec-5e00000003ec' % (i % CHATS)
+        message['uid'] = message['author']['uid'] = author
+        yield ujson.dumps(frame)
+
+
+def measure(kind: str, count: int) -> typing.Tuple[int, float]:
+    build = KINDS[kind]
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    messages = [build(ujson.loads(frame)['o']['chatMessage']) for frame in frames(count)]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    return size, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000, help='number of messages')
+    parser.add_argument('--kind', choices=KINDS, action='append', help='message kind, default all')
+    args = parser.parse_args()
+    for kind in args.kind or KINDS:
+        size, elapsed = measure(kind, args.count)
+        print('%-8s %8.1f MiB  %6d bytes/message  %7.2f s' % (
+            kind, size / 2**20, size // args.count, elapsed))
+
+
+if __name__ == '__main__':
+    main()
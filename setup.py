@@ -25,6 +25,7 @@ with open('README.md') as readme, open('requirements.txt') as requirements:
             'ViktorSky'
         ],
         install_requires=requirements.read().split(),
+        extras_require={'speed': ['orjson']},
         classifiers=[
             'License :: OSI Approved :: MIT License',
             'Operating System :: OS Independent',
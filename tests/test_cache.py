@@ -0,0 +1,43 @@
+"""Response cache: stale-while-revalidate refreshes."""
+import asyncio
+
+from aminobots import Amino, ResponseCache
+from aminobots.testing import FakeAmino
+
+
+def test_close_cancels_refreshes():
+    async def main():
+        cache = ResponseCache(ttl={'get_user_info': 0.05}, stale_ttl={'get_user_info': 60})
+        async with FakeAmino(latency=0.2) as fake:
+            fake.route('GET', 'user-profile/{userId}', lambda r: {'userProfile': {'uid': r.match['userId']}})
+            async with Amino(cache=cache) as amino:
+                fake.bind(amino)
+                await amino.get_user_info('abc')
+                await asyncio.sleep(0.1)
+                # stale, refreshed in the background
+                await amino.get_user_info('abc')
+                assert cache._refreshing
+            assert not cache._refreshing
+            await asyncio.sleep(0.3)
+            assert amino.http.closed
+    asyncio.run(main())
+
+
+def test_invalidate_keeps_newer_refresh():
+    async def main():
+        cache = ResponseCache()
+
+        async def fetch():
+            await asyncio.sleep(1)
+            return {}
+
+        cache.revalidate('endpoint|key', fetch)
+        cache.invalidate('endpoint')
+        cache.revalidate('endpoint|key', fetch)
+        task = cache._refreshing['endpoint|key']
+        # the done callback of the cancelled refresh runs after the new one started
+        await asyncio.sleep(0.01)
+        assert cache._refreshing == {'endpoint|key': task}
+        await cache.cancel_refreshes()
+        assert not cache._refreshing
+    asyncio.run(main())
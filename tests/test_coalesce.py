@@ -0,0 +1,73 @@
+"""Coalescing of identical in-flight GET requests."""
+import asyncio
+
+import pytest
+
+from aminobots import Amino, RetryPolicy
+from aminobots.testing import FakeAmino
+
+
+def run(test, latency=0.1):
+    async def main():
+        async with FakeAmino(latency=latency) as fake, Amino(retry=RetryPolicy.never()) as amino:
+            fake.bind(amino)
+            fake.route('GET', '{path}', {})
+            fake.route('GET', 'community/trending', {})
+            return await test(fake, amino)
+    return asyncio.run(main())
+
+
+def test_coalesce_shares_response():
+    async def test(fake, amino):
+        first, second = await asyncio.gather(
+            amino.http.get('thread', coalesce=True),
+            amino.http.get('thread', coalesce=True))
+        assert first is second
+        assert fake.stats['requests'] == 1
+    run(test)
+
+
+def test_raw_methods_not_shared():
+    async def test(fake, amino):
+        first, second = await asyncio.gather(
+            amino.get_community_trending(1),
+            amino.get_community_trending(1))
+        assert first is not second
+        assert fake.stats['requests'] == 2
+    run(test)
+
+
+def test_last_caller_cancels_request():
+    async def test(fake, amino):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(amino.http.get('thread', coalesce=True), 0.05)
+        await asyncio.sleep(0)
+        assert not amino.http._inflight
+        await amino.close()
+        await asyncio.sleep(0.4)
+        assert amino.http.closed
+    run(test, latency=0.3)
+
+
+def test_cancelled_caller_keeps_shared_request():
+    async def test(fake, amino):
+        waiter = asyncio.ensure_future(amino.http.get('thread', coalesce=True))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(amino.http.get('thread', coalesce=True), 0.05)
+        response = await waiter
+        assert response['api:statuscode'] == 0
+        assert fake.stats['requests'] == 1
+    run(test)
+
+
+def test_close_cancels_inflight():
+    async def test(fake, amino):
+        waiter = asyncio.ensure_future(amino.http.get('thread', coalesce=True))
+        await asyncio.sleep(0.05)
+        await amino.close()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not amino.http._inflight
+        await asyncio.sleep(0.4)
+        assert amino.http.closed
+    run(test, latency=0.3)
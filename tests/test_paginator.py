@@ -0,0 +1,42 @@
+"""Paginator: prefetch, fan-out and resuming after an error."""
+import asyncio
+
+import pytest
+
+from aminobots.paginator import Paginator
+
+ITEMS = list(range(100))
+
+
+def listing(fail=()):
+    failures = set(fail)
+
+    async def fetch(start, size):
+        await asyncio.sleep(0.001)
+        if start in failures:
+            failures.discard(start)
+            raise ConnectionError(start)
+        return ITEMS[start:start + size]
+    return fetch
+
+
+def test_fan_out_in_order():
+    async def main():
+        paginator = Paginator(listing(), list, size=10, concurrency=4)
+        assert await paginator.collect() == ITEMS
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('options', [{'total': 100}, {'limit': 100}])
+def test_resume_after_error(options):
+    async def main():
+        paginator = Paginator(listing(fail=[25]), list, size=25, concurrency=4, **options)
+        items = []
+        with pytest.raises(ConnectionError):
+            async for item in paginator:
+                items.append(item)
+        # the caller retries, the iteration goes on from the failed page
+        items.extend(await paginator.collect())
+        assert items == ITEMS
+        assert repr(paginator).endswith('done=True>')
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""Retry policy of the HTTP client against :class:`FakeAmino`."""
+import asyncio
+from time import monotonic
+
+import pytest
+
+from aminobots import Amino, RetryPolicy, errors
+from aminobots.testing import FakeAmino, Fault
+
+
+def run(test, retry, **kwargs):
+    async def main():
+        async with FakeAmino() as fake, Amino(retry=retry, **kwargs) as amino:
+            fake.bind(amino)
+            fake.route('GET', '{path}', {})
+            fake.route('POST', '{path}', {})
+            return await test(fake, amino)
+    return asyncio.run(main())
+
+
+def fast(**kwargs):
+    return RetryPolicy(base=0.001, jitter=False, **kwargs)
+
+
+def test_retry_server_error():
+    async def test(fake, amino):
+        fake.inject(Fault(status=503, times=2))
+        response = await amino.http.request('GET', 'thread')
+        assert response['api:statuscode'] == 0
+        assert fake.stats['requests'] == 3
+    run(test, fast())
+
+
+def test_no_retry_client_error():
+    async def test(fake, amino):
+        fake.inject(Fault(status=400))
+        with pytest.raises(errors.BadRequest):
+            await amino.http.request('GET', 'thread')
+        assert fake.stats['requests'] == 1
+    run(test, fast())
+
+
+def test_no_retry_post_on_internal_error():
+    async def test(fake, amino):
+        fake.inject(Fault(status=500))
+        with pytest.raises(errors.InternalServerError):
+            await amino.http.request('POST', 'thread', json={})
+        assert fake.stats['requests'] == 1
+    run(test, fast())
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retry_post_on_unprocessed(status):
+    async def test(fake, amino):
+        fake.inject(Fault(status=status))
+        response = await amino.http.request('POST', 'thread', json={})
+        assert response['api:statuscode'] == 0
+        assert fake.stats['requests'] == 2
+    run(test, fast())
+
+
+def test_retry_after():
+    async def test(fake, amino):
+        fake.inject(Fault(status=429, retry_after=0.2))
+        started = monotonic()
+        await amino.http.request('GET', 'thread')
+        assert monotonic() - started >= 0.2
+        assert fake.stats['requests'] == 2
+    run(test, fast())
+
+
+def test_max_elapsed():
+    async def test(fake, amino):
+        fake.inject(Fault(status=503, times=None, retry_after=1.0))
+        started = monotonic()
+        with pytest.raises(errors.ServiceUnavailable):
+            await amino.http.request('GET', 'thread')
+        assert monotonic() - started < 1.0
+        assert fake.stats['requests'] == 1
+    run(test, fast(max_elapsed=0.5))
+
+
+def test_tries_exhausted_without_raise():
+    async def test(fake, amino):
+        fake.inject(Fault(status=503, message='Down.', times=None))
+        response = await amino.http.request('GET', 'thread')
+        assert response == 'Down.'
+        assert fake.stats['requests'] == 3
+    run(test, fast(tries=3), raiseExceptions=False)
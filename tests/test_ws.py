@@ -0,0 +1,186 @@
+"""Websocket client: frame decoding and the connection supervisor."""
+import asyncio
+import base64
+import json
+
+import pytest
+
+from aminobots import Amino, RetryPolicy, Transport
+from aminobots.enums import WebSocketState
+from aminobots.testing import FakeAmino
+
+SID = base64.urlsafe_b64encode(b'\x02' + json.dumps({
+    '0': 2, '1': None, '2': 'uid', '3': 0, '4': '127.0.0.1', '5': 1, '6': 100
+}).encode() + bytes(20)).decode().rstrip('=')
+
+
+async def handler(event):
+    pass
+
+
+@pytest.mark.parametrize('data', [
+    'not json',
+    '[1]',
+    '{"o": {}}',
+    '{"t": 1000, "o": [1]}',
+    '{"t": 1000, "o": {"chatMessage": [1]}}',
+    '{"t": 1000, "o": {"chatMessage": "text"}}',
+])
+def test_decode_invalid(data):
+    async def main():
+        async with Amino() as amino:
+            amino.ws.add_handler(1000, handler)
+            assert amino.ws.decode(data) is None
+            assert amino.ws.stats['invalid'] == 1
+    asyncio.run(main())
+
+
+def test_decode_chat_message():
+    async def main():
+        async with Amino() as amino:
+            amino.ws.add_handler('1000:0:0', handler)
+            event = amino.ws.decode('{"t": 1000, "o": {"ndcId": 5, "chatMessage": {'
+                                    '"type": 0, "mediaType": 0, "threadId": "abc"}}}')
+            assert (event.key, event.comId, event.chatId) == ('1000:0:0', 5, 'abc')
+            assert amino.ws.decode('{"t": 1000, "o": {"chatMessage": {"type": 1}}}') is None
+            assert amino.ws.stats['unhandled'] == 1
+    asyncio.run(main())
+
+
+def test_consumer_survives_errors():
+    async def main():
+        async with Amino() as amino:
+            ws = amino.ws
+            ws.executor = None
+            dispatched = []
+
+            async def dispatch_event(event):
+                dispatched.append(event)
+                raise RuntimeError(event)
+
+            ws.dispatch_event = dispatch_event
+            ws.start_consumers()
+            for n in range(3):
+                await ws.queue.put('1000', n)
+                await asyncio.wait_for(ws.queue.join(), 1)
+            assert dispatched == [0, 1, 2]
+            assert not ws._consumers[0].done()
+            await ws.stop_consumers()
+    asyncio.run(main())
+
+
+def supervise(test, retry=None, latency=0.0, **kwargs):
+    async def main():
+        async with FakeAmino(latency=latency) as fake, Amino(**kwargs) as amino:
+            fake.bind(amino)
+            amino.sid = SID
+            ws = amino.ws
+            ws.retry = retry or RetryPolicy(base=0.01, cap=0.05, jitter=False)
+            states = []
+
+            async def record(event):
+                url = event.data['url']
+                states.append((event.key, url and url.rsplit('/', 1)[-1], event.data['attempt']))
+
+            for state in WebSocketState:
+                ws.add_handler(state, record)
+            return await test(fake, amino, states)
+    return asyncio.run(main())
+
+
+async def wait_state(states, state, count=1, timeout=2.0):
+    async def waiter():
+        while sum(key == state.value for key, _, _ in states) < count:
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(waiter(), timeout)
+
+
+def test_rotate_endpoints():
+    async def test(fake, amino, states):
+        signbodies = []
+        handshake = amino.ws._handshake
+
+        def signed(url, token_url):
+            params, headers = handshake(url, token_url)
+            signbodies.append(params['signbody'])
+            return params, headers
+
+        amino.ws._handshake = signed
+        fake.reject_websocket(2)
+        await amino.ws.connect_daemon(timeout=2)
+        connecting = [(url, attempt) for key, url, attempt in states if key == WebSocketState.CONNECTING.value]
+        assert connecting == [('ws1', 0), ('ws2', 1), ('ws3', 2)]
+        assert fake.stats['handshakes'] == 3
+        # signed again on each attempt
+        assert len(set(signbodies)) == 3
+        assert fake.stats['invalid_signatures'] == 0
+    supervise(test)
+
+
+def test_reconnect_after_disconnect():
+    async def test(fake, amino, states):
+        await amino.ws.connect_daemon(timeout=2)
+        for count in (2, 3):
+            await fake.disconnect()
+            await wait_state(states, WebSocketState.CONNECTED, count)
+        connected = [(url, attempt) for key, url, attempt in states if key == WebSocketState.CONNECTED.value]
+        # no frame was received, the backoff keeps growing
+        assert connected == [('ws1', 0), ('ws2', 1), ('ws3', 2)]
+        await fake.send({'t': 1000, 'o': {}})
+        await asyncio.sleep(0.05)
+        await fake.disconnect()
+        await wait_state(states, WebSocketState.CONNECTED, 4)
+        assert states[-3:] == [
+            (WebSocketState.DISCONNECTED.value, 'ws3', 0),
+            (WebSocketState.CONNECTING.value, 'ws4', 1),
+            (WebSocketState.CONNECTED.value, 'ws4', 1)
+        ]
+    supervise(test)
+
+
+def test_close_during_backoff():
+    async def test(fake, amino, states):
+        fake.reject_websocket()
+        task = asyncio.ensure_future(amino.ws.connect())
+        await wait_state(states, WebSocketState.DISCONNECTED)
+        await asyncio.wait_for(amino.ws.close(), 1)
+        await asyncio.wait_for(task, 1)
+        assert states[-1][0] == WebSocketState.CLOSED.value
+        assert fake.stats['handshakes'] == 1
+    supervise(test, RetryPolicy(base=30.0, jitter=False))
+
+
+def test_close_during_handshake():
+    async def test(fake, amino, states):
+        amino.ws._task = asyncio.ensure_future(amino.ws.connect())
+        while not fake.stats['handshakes']:
+            await asyncio.sleep(0.005)
+        await asyncio.wait_for(amino.ws.close(), 1)
+        assert amino.ws._task.done() and not amino.ws._task.cancelled()
+        await asyncio.sleep(0.3)
+        assert amino.ws.state == WebSocketState.CLOSED
+        assert fake.stats['handshakes'] == 1
+        assert not fake.websockets
+    supervise(test, latency=0.2)
+
+
+def test_websocket_outside_http_limit():
+    async def test(fake, amino, states):
+        fake.route('GET', '{path}', {})
+        await amino.ws.connect_daemon(timeout=2)
+        # the only http connection is still free
+        response = await asyncio.wait_for(amino.http.request('GET', 'thread'), 1)
+        assert response['api:statuscode'] == 0
+        await amino.http.transport.close()
+    supervise(test, transport=Transport(limit=1))
+
+
+def test_amino_close_stops_websocket():
+    async def test(fake, amino, states):
+        await amino.ws.connect_daemon(timeout=2)
+        task = amino.ws._task
+        await amino.close()
+        assert task.done()
+        assert amino.ws.closed
+        assert amino.http.transport._ws_session is None
+    supervise(test)